@@ -2,47 +2,40 @@
 TinyGPT-MCP: Production-Grade AI Assistant
 FastAPI backend with authentication, rate limiting, and plugin architecture
 """
+import asyncio
 import os
 import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import logging
 
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+import orjson
 from pydantic import BaseModel, Field
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-import redis
+from redis import asyncio as aioredis
 from contextlib import asynccontextmanager
 
 from core.tinygpt_model import TinyGPTModel
 from core.mcp_engine import MCPEngine
-from core.tool_manager import ToolManager
+from core.tool_manager import ToolManager, BaseTool
 from core.auth import AuthManager
 from core.database import DatabaseManager
+from core.rate_limiter import RateLimiter
 from utils.logger import setup_logger
 
 # Setup logging
 logger = setup_logger(__name__)
 
-# Initialize Redis for rate limiting
-try:
-    redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-    redis_client.ping()
-except:
-    logger.warning("Redis not available, using in-memory rate limiting")
-    redis_client = None
-
-# Rate limiter
-limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri="redis://localhost:6379" if redis_client else "memory://",
-    default_limits=["100/hour"]
-)
+# Async Redis client for stats caching; availability is checked in lifespan
+# so module import never blocks on a network round trip
+redis_client = aioredis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+
+# Rate limiter (Redis Lua sliding windows + concurrent-request gate)
+rate_limiter = RateLimiter()
 
 # Global components
 tinygpt_model = None
@@ -57,14 +50,33 @@ async def lifespan(app: FastAPI):
     global tinygpt_model, mcp_engine, tool_manager, auth_manager, db_manager
     
     logger.info("Starting TinyGPT-MCP application...")
-    
+
+    # Eager tasks (3.12+) let coroutines that finish without awaiting I/O
+    # complete without ever being scheduled on the loop
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
     # Initialize components
-    db_manager = DatabaseManager()
+    try:
+        await redis_client.ping()
+        app.state.redis_ok = True
+        logger.info("Redis connection established")
+    except (aioredis.RedisError, OSError) as e:
+        app.state.redis_ok = False
+        logger.warning("Redis not available, stats caching disabled: %s", e)
+
+    await rate_limiter.initialize()
+
+    db_manager = DatabaseManager(redis_client=redis_client)
     await db_manager.initialize()
     
     auth_manager = AuthManager(db_manager)
     tool_manager = ToolManager()
     await tool_manager.initialize()
+
+    # Warm connections to the tool API hosts in the background; kept on
+    # app.state so the task isn't garbage-collected mid-flight
+    app.state.http_warmup = asyncio.get_running_loop().create_task(BaseTool.warmup())
     
     tinygpt_model = TinyGPTModel()
     await tinygpt_model.initialize()
@@ -78,6 +90,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     if db_manager:
         await db_manager.close()
+    await rate_limiter.close()
+    await BaseTool.aclose()
+    await redis_client.aclose()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -86,13 +101,10 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Add rate limiting
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -167,7 +179,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         user = await auth_manager.verify_token(credentials.credentials)
         return user
     except Exception as e:
-        logger.warning(f"Token verification failed: {e}")
+        logger.warning("Token verification failed: %s", e)
         return None
 
 async def require_auth(user = Depends(get_current_user)):
@@ -182,10 +194,17 @@ async def require_auth(user = Depends(get_current_user)):
 
 # Routes
 @app.get("/", response_model=SystemStatus)
-async def root():
+async def root(request: Request, response: Response):
     """System status and health check"""
+    # The expensive parts of this payload refresh every 30-60 s, so let
+    # polling clients revalidate on a 30 s window
+    etag = f'W/"status-{int(time.time() // 30)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    response.headers["ETag"] = etag
+
     uptime = time.time() - app.state.start_time if hasattr(app.state, 'start_time') else 0
-    
+
     return SystemStatus(
         status="healthy",
         version="2.0.0",
@@ -196,8 +215,11 @@ async def root():
         requests_today=await db_manager.get_requests_today() if db_manager else 0
     )
 
-@app.post("/auth/login", response_model=AuthResponse)
-@limiter.limit("5/minute")
+@app.post(
+    "/auth/login",
+    response_model=AuthResponse,
+    dependencies=[Depends(rate_limiter.ip_limit("login", 5, 60))]
+)
 async def login(request: Request, auth_request: AuthRequest):
     """User authentication"""
     try:
@@ -214,14 +236,17 @@ async def login(request: Request, auth_request: AuthRequest):
         )
     
     except Exception as e:
-        logger.warning(f"Login failed for {auth_request.username}: {e}")
+        logger.warning("Login failed for %s: %s", auth_request.username, e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-@app.post("/auth/register", response_model=AuthResponse)
-@limiter.limit("3/minute")
+@app.post(
+    "/auth/register",
+    response_model=AuthResponse,
+    dependencies=[Depends(rate_limiter.ip_limit("register", 3, 60))]
+)
 async def register(request: Request, auth_request: AuthRequest):
     """User registration"""
     try:
@@ -238,48 +263,65 @@ async def register(request: Request, auth_request: AuthRequest):
         )
     
     except Exception as e:
-        logger.error(f"Registration failed for {auth_request.username}: {e}")
+        logger.error("Registration failed for %s: %s", auth_request.username, e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Registration failed"
         )
 
 @app.get("/tools", response_model=List[ToolInfo])
-async def get_tools(user = Depends(get_current_user)):
+async def get_tools(request: Request, response: Response, user = Depends(get_current_user)):
     """Get available tools"""
-    tools = tool_manager.get_available_tools()
-    
-    return [
-        ToolInfo(
-            name=tool.name,
-            description=tool.description,
-            parameters=tool.get_parameters(),
-            category=tool.category,
-            enabled=tool.enabled
-        )
-        for tool in tools
-    ]
+    # Tool definitions only change on admin toggles/reloads, so clients can
+    # revalidate against the version counter for free
+    etag = f'W/"tools-{tool_manager.tools_version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    response.headers["ETag"] = etag
+
+    return tool_manager.get_available_tools_serialized()
 
 @app.post("/ask", response_model=ChatResponse)
-@limiter.limit("30/minute")
 async def ask(
     request: Request,
     chat_request: ChatRequest,
     user = Depends(require_auth)
 ):
     """Main chat endpoint with MCP tool calling"""
-    start_time = time.time()
-    request_id = f"req_{int(time.time() * 1000)}"
-    
+    # Capture time once; perf_counter for durations, one utcnow shared by the
+    # request log and the response so their timestamps agree. The uuid suffix
+    # keeps request ids collision-free under concurrency.
+    start_perf = time.perf_counter()
+    now = datetime.utcnow()
+    request_id = f"req_{int(now.timestamp() * 1000)}_{uuid.uuid4().hex[:8]}"
+
+    await rate_limiter.check_user("ask", user["id"], limit=30, window=60)
+
+    # Cap concurrent /ask requests per user so slow generations
+    # can't monopolize the worker
+    if not await rate_limiter.acquire_slot(user["id"], request_id):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent requests"
+        )
+
+    if chat_request.stream:
+        # SSE path: first token reaches the client as soon as it exists;
+        # the generator owns the concurrency slot until the stream ends
+        return StreamingResponse(
+            _stream_ask(chat_request, user, request_id, now, start_perf),
+            media_type="text/event-stream"
+        )
+
     try:
-        logger.info(f"Processing request {request_id} from user {user['id']}")
+        logger.info("Processing request %s from user %s", request_id, user["id"])
         
         # Log request
         await db_manager.log_request(
             user_id=user["id"],
             request_id=request_id,
             prompt=chat_request.prompt,
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
         
         # Generate response with TinyGPT
@@ -301,8 +343,8 @@ async def ask(
             tool_calls=tool_calls
         )
         
-        processing_time = time.time() - start_time
-        
+        processing_time = time.perf_counter() - start_perf
+
         response = ChatResponse(
             id=request_id,
             thought=final_response["thought"],
@@ -321,25 +363,86 @@ async def ask(
             model_info=model_response["model_info"],
             processing_time=processing_time,
             tokens_used=model_response["tokens_used"],
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
         
-        # Log response
+        # Log response (already-serialized JSON goes straight to the DB)
         await db_manager.log_response(
             request_id=request_id,
-            response=response.dict(),
+            response_json=response.model_dump_json(),
             processing_time=processing_time
         )
         
         return response
-    
+
     except Exception as e:
-        logger.error(f"Error processing request {request_id}: {e}")
+        logger.error("Error processing request %s: %s", request_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Processing error: {str(e)}"
         )
 
+    finally:
+        await rate_limiter.release_slot(user["id"], request_id)
+
+async def _stream_ask(chat_request: ChatRequest, user, request_id: str, now, start_perf: float):
+    """Yield SSE frames for a streaming /ask request"""
+    try:
+        await db_manager.log_request(
+            user_id=user["id"],
+            request_id=request_id,
+            prompt=chat_request.prompt,
+            timestamp=now
+        )
+
+        model_response = None
+        async for event in tinygpt_model.generate_stream(
+            prompt=chat_request.prompt,
+            temperature=chat_request.temperature,
+            max_tokens=chat_request.max_tokens
+        ):
+            if event["type"] == "token":
+                yield b"data: " + orjson.dumps({"text": event["text"]}) + b"\n\n"
+            else:
+                model_response = event["result"]
+
+        tool_calls = await mcp_engine.process_response(
+            model_response["text"],
+            available_tools=chat_request.tools
+        )
+        final_response = await mcp_engine.format_final_response(
+            original_response=model_response["text"],
+            tool_calls=tool_calls
+        )
+
+        processing_time = time.perf_counter() - start_perf
+        done_payload = {
+            "id": request_id,
+            "thought": final_response["thought"],
+            "tool_calls": tool_calls,
+            "final_answer": final_response["final_answer"],
+            "model_info": model_response["model_info"],
+            "processing_time": processing_time,
+            "tokens_used": model_response["tokens_used"],
+            "timestamp": now.isoformat()
+        }
+
+        # The batched log queue means the client never waits on this write
+        await db_manager.log_response(
+            request_id=request_id,
+            response_json=orjson.dumps(done_payload, default=str).decode(),
+            processing_time=processing_time
+        )
+
+        yield b"event: done\ndata: " + orjson.dumps(done_payload, default=str) + b"\n\n"
+
+    except Exception as e:
+        logger.error("Error streaming request %s: %s", request_id, e)
+        yield b"event: error\ndata: " + orjson.dumps({"detail": str(e)}) + b"\n\n"
+
+    finally:
+        await rate_limiter.release_slot(user["id"], request_id)
+
 @app.get("/status")
 async def detailed_status():
     """Detailed system status"""
@@ -360,7 +463,7 @@ async def detailed_status():
         }
     
     except Exception as e:
-        logger.error(f"Status check failed: {e}")
+        logger.error("Status check failed: %s", e)
         return JSONResponse(
             status_code=503,
             content={"status": "unhealthy", "error": str(e)}
@@ -398,10 +501,11 @@ async def get_chat_history(
             limit=limit,
             offset=offset
         )
-        return {"history": history, "total": len(history)}
+        total = await db_manager.get_user_history_count(user["id"])
+        return {"history": history, "total": total, "limit": limit, "offset": offset}
     
     except Exception as e:
-        logger.error(f"Error fetching history for user {user['id']}: {e}")
+        logger.error("Error fetching history for user %s: %s", user["id"], e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch history"
@@ -415,12 +519,23 @@ async def startup_event():
 
 if __name__ == "__main__":
     import uvicorn
-    
+
+    # Install libuv's event loop globally so any loop created before
+    # uvicorn takes over (and the workers themselves) runs on uvloop
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     logger.info("Starting TinyGPT-MCP server...")
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+        log_level="info",
+        access_log=False
     )
\ No newline at end of file
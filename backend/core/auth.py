@@ -2,29 +2,45 @@
 Authentication Manager with JWT tokens
 """
 import os
+import asyncio
+import hashlib
+import time
 import jwt
 import bcrypt
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import logging
 
+from cachetools import TTLCache
+
 logger = logging.getLogger(__name__)
 
 class AuthManager:
     """
     JWT-based authentication manager
     """
-    
+
     def __init__(self, db_manager):
         self.db_manager = db_manager
         self.secret_key = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
         self.algorithm = "HS256"
         self.access_token_expire_minutes = 60
+        self.bcrypt_cost = int(os.getenv("BCRYPT_COST", "12"))
+        # Cache of verified token payloads so repeat requests skip the
+        # HMAC verification + JSON decode. Keyed by sha256(token) and kept
+        # short-lived so expiry stays accurate; failures are never cached.
+        self.token_cache_ttl = 5
+        self._token_cache: TTLCache = TTLCache(maxsize=10000, ttl=self.token_cache_ttl)
+        self._token_cache_lock = asyncio.Lock()
     
     async def create_user(self, username: str, password: str) -> Dict[str, Any]:
         """Create a new user"""
-        # Hash password
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        # Hash password in a worker thread; bcrypt is CPU-bound and would
+        # otherwise block the event loop for hundreds of milliseconds
+        loop = asyncio.get_running_loop()
+        password_hash = await loop.run_in_executor(
+            None, bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.bcrypt_cost)
+        )
         
         # Create user in database
         user_id = await self.db_manager.create_user(username, password_hash.decode('utf-8'))
@@ -39,13 +55,17 @@ class AuthManager:
     
     async def authenticate_user(self, username: str, password: str) -> Dict[str, Any]:
         """Authenticate user and return token"""
-        user = await self.db_manager.get_user_by_username(username)
-        
+        user = await self.db_manager.get_user_credentials(username)
+
         if not user:
             raise ValueError("User not found")
         
-        # Verify password
-        if not bcrypt.checkpw(password.encode('utf-8'), user["password_hash"].encode('utf-8')):
+        # Verify password off the event loop (same reasoning as create_user)
+        loop = asyncio.get_running_loop()
+        password_ok = await loop.run_in_executor(
+            None, bcrypt.checkpw, password.encode('utf-8'), user["password_hash"].encode('utf-8')
+        )
+        if not password_ok:
             raise ValueError("Invalid password")
         
         # Generate token
@@ -58,22 +78,41 @@ class AuthManager:
     
     async def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify JWT token and return user info"""
+        cache_key = hashlib.sha256(token.encode()).digest()
+
+        cached = self._token_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            user_id = payload.get("sub")
+            # require lets the library reject malformed tokens before any
+            # further claim handling
+            payload = jwt.decode(
+                token,
+                self.secret_key,
+                algorithms=[self.algorithm],
+                options={"require": ["exp", "sub"]}
+            )
+            user_id = payload["sub"]
             username = payload.get("username")
-            
-            if not user_id:
-                raise ValueError("Invalid token")
-            
-            return {
+
+            user = {
                 "id": user_id,
                 "username": username
             }
-        
+
+            # Only cache tokens that outlive the cache TTL, so a cached
+            # entry can never be served past the token's own expiry.
+            exp = payload.get("exp")
+            if exp and exp - time.time() > self.token_cache_ttl:
+                async with self._token_cache_lock:
+                    self._token_cache[cache_key] = user
+
+            return user
+
         except jwt.ExpiredSignatureError:
             raise ValueError("Token expired")
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise ValueError("Invalid token")
     
     def _create_access_token(self, data: Dict[str, Any]) -> str:
@@ -0,0 +1,83 @@
+"""
+Async TTL cache for tool results
+"""
+import asyncio
+import functools
+from time import monotonic
+from typing import Any, Callable, Dict
+
+import orjson
+from cachetools import TTLCache
+
+def async_ttl_cache(ttl_seconds: float, maxsize: int = 256) -> Callable:
+    """
+    Cache an async tool method's result for ttl_seconds
+
+    The key is the params dict serialized with sorted keys, so logically
+    identical calls hit the same entry regardless of argument order.
+    Simultaneous misses for one key collapse into a single upstream
+    request: the first caller registers an in-flight future and every
+    other caller awaits it, so a burst of identical queries costs one
+    round-trip instead of one per caller.
+
+    Entries go soft-stale after ttl_seconds but stay servable for twice
+    that: a stale hit returns immediately while one background task
+    refreshes the entry, so callers only wait on the network after an
+    entry has been untouched for a full 2x ttl_seconds.
+    """
+    def decorator(func: Callable) -> Callable:
+        # Hard eviction at twice the TTL; between ttl and 2*ttl the
+        # entry is served stale while a refresh runs in the background
+        cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds * 2)
+        inflight: Dict[bytes, asyncio.Future] = {}
+
+        async def refresh(self, params: Dict[str, Any], key: bytes) -> Any:
+            try:
+                result = await func(self, params)
+                cache[key] = (result, monotonic() + ttl_seconds)
+                return result
+            except Exception:
+                # Refresh failed; keep serving the stale entry until its
+                # hard expiry rather than surfacing a background error
+                stale = cache.get(key)
+                if stale is None:
+                    raise
+                return stale[0]
+            finally:
+                inflight.pop(key, None)
+
+        @functools.wraps(func)
+        async def wrapper(self, params: Dict[str, Any]) -> Any:
+            key = orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+            entry = cache.get(key)
+            if entry is not None:
+                value, soft_deadline = entry
+                if monotonic() >= soft_deadline and key not in inflight:
+                    inflight[key] = asyncio.get_running_loop().create_task(
+                        refresh(self, params, key)
+                    )
+                return value
+
+            future = inflight.get(key)
+            if future is not None:
+                # Another caller is already fetching this key
+                return await future
+
+            future = asyncio.get_running_loop().create_future()
+            inflight[key] = future
+            try:
+                result = await func(self, params)
+                cache[key] = (result, monotonic() + ttl_seconds)
+                future.set_result(result)
+                return result
+            except BaseException as e:
+                future.set_exception(e)
+                # Consume the exception ourselves in case nobody else is
+                # waiting on the future
+                future.exception()
+                raise
+            finally:
+                inflight.pop(key, None)
+
+        return wrapper
+    return decorator
@@ -3,167 +3,292 @@ Database Manager with SQLite for development
 """
 import sqlite3
 import aiosqlite
-import json
+import asyncio
+import orjson
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Hot SQL kept as module constants: the same string object always reaches the
+# connection, so SQLite's per-connection statement cache reuses the prepared
+# bytecode instead of re-running sqlite3_prepare per call.
+SQL_LOG_REQUEST = "INSERT INTO requests (id, user_id, prompt, timestamp) VALUES (?, ?, ?, ?)"
+SQL_LOG_RESPONSE = "INSERT INTO responses (request_id, response_data, processing_time) VALUES (?, ?, ?)"
+SQL_USER_HISTORY = """
+    SELECT r.id, r.prompt, r.timestamp, res.response_data, res.processing_time
+    FROM requests r
+    LEFT JOIN responses res ON r.id = res.request_id
+    WHERE r.user_id = ?
+    ORDER BY r.timestamp DESC
+    LIMIT ? OFFSET ?
+"""
+SQL_USER_HISTORY_COUNT = "SELECT COUNT(*) FROM requests WHERE user_id = ?"
+SQL_REQUESTS_TODAY = "SELECT COUNT(*) FROM requests WHERE timestamp >= ? AND timestamp < ?"
+SQL_ACTIVE_USERS = "SELECT COUNT(DISTINCT user_id) FROM requests WHERE timestamp > ?"
+
 class DatabaseManager:
     """
     SQLite database manager for development
     """
-    
-    def __init__(self, db_path: str = "tinygpt_mcp.db"):
+
+    def __init__(self, db_path: str = "tinygpt_mcp.db", redis_client=None):
         self.db_path = db_path
-    
+        # Optional Redis client used to cache hot aggregate counters
+        self.redis = redis_client
+        self._db: Optional[aiosqlite.Connection] = None
+        # SQLite allows a single writer; serialize writes over the shared connection
+        self._write_lock = asyncio.Lock()
+        # Request/response logging is queued and flushed in batches by a
+        # background worker so /ask never waits on a commit.
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
+        self._log_batch_size = 100
+        self._log_flush_interval = 0.05
+
     async def initialize(self):
         """Initialize database and create tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Users table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_admin BOOLEAN DEFAULT FALSE
-                )
-            """)
-            
-            # Requests table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS requests (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT NOT NULL,
-                    prompt TEXT NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            """)
-            
-            # Responses table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS responses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    request_id TEXT NOT NULL,
-                    response_data TEXT NOT NULL,
-                    processing_time REAL NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (request_id) REFERENCES requests (id)
-                )
-            """)
-            
-            await db.commit()
-            logger.info("Database initialized successfully")
-    
+        # One persistent connection reused by every call; opening a fresh
+        # connection per query re-pays sqlite3_open and cache warmup each time.
+        self._db = await aiosqlite.connect(self.db_path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute("PRAGMA temp_store=MEMORY")
+        await self._db.execute("PRAGMA mmap_size=268435456")
+        await self._db.execute("PRAGMA cache_size=-20000")
+
+        # Users table
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id TEXT PRIMARY KEY,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                is_admin BOOLEAN DEFAULT FALSE
+            )
+        """)
+
+        # Requests table
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS requests (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        """)
+
+        # Responses table
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id TEXT NOT NULL,
+                response_data TEXT NOT NULL,
+                processing_time REAL NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (request_id) REFERENCES requests (id)
+            )
+        """)
+
+        # Index so the stats counters stay O(log n) as requests grows
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_requests_ts ON requests(timestamp)"
+        )
+        # Covering index for per-user history pagination and counts
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_requests_user_ts ON requests(user_id, timestamp DESC)"
+        )
+
+        await self._db.commit()
+
+        self._log_queue = asyncio.Queue()
+        self._log_task = asyncio.create_task(self._log_worker())
+
+        logger.info("Database initialized successfully")
+
     async def create_user(self, username: str, password_hash: str) -> str:
         """Create a new user"""
         import uuid
         user_id = str(uuid.uuid4())
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT INTO users (id, username, password_hash) VALUES (?, ?, ?)",
+
+        async with self._write_lock:
+            # RETURNING confirms the row in the same statement (SQLite >= 3.35)
+            cursor = await self._db.execute(
+                "INSERT INTO users (id, username, password_hash) VALUES (?, ?, ?) RETURNING id",
                 (user_id, username, password_hash)
             )
-            await db.commit()
-        
+            row = await cursor.fetchone()
+            await self._db.commit()
+
         logger.info(f"Created user: {username}")
-        return user_id
-    
+        return row[0]
+
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT * FROM users WHERE username = ?",
-                (username,)
-            )
-            row = await cursor.fetchone()
-            
-            if row:
-                return dict(row)
-            return None
-    
+        cursor = await self._db.execute(
+            "SELECT * FROM users WHERE username = ?",
+            (username,)
+        )
+        cursor.row_factory = aiosqlite.Row
+        row = await cursor.fetchone()
+
+        if row:
+            return dict(row)
+        return None
+
+    async def get_user_credentials(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get only the fields needed for authentication"""
+        cursor = await self._db.execute(
+            "SELECT id, password_hash FROM users WHERE username = ?",
+            (username,)
+        )
+        row = await cursor.fetchone()
+
+        if row:
+            return {"id": row[0], "password_hash": row[1]}
+        return None
+
     async def log_request(self, user_id: str, request_id: str, prompt: str, timestamp: datetime):
-        """Log a user request"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT INTO requests (id, user_id, prompt, timestamp) VALUES (?, ?, ?, ?)",
-                (request_id, user_id, prompt, timestamp)
-            )
-            await db.commit()
-    
-    async def log_response(self, request_id: str, response: Dict[str, Any], processing_time: float):
-        """Log a response"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT INTO responses (request_id, response_data, processing_time) VALUES (?, ?, ?)",
-                (request_id, json.dumps(response, default=str), processing_time)
-            )
-            await db.commit()
-    
+        """Log a user request (queued, flushed in batches)"""
+        self._log_queue.put_nowait(("req", (request_id, user_id, prompt, timestamp)))
+
+    async def log_response(self, request_id: str, response_json: str, processing_time: float):
+        """Log a pre-serialized response (queued, flushed in batches)"""
+        self._log_queue.put_nowait(("resp", (request_id, response_json, processing_time)))
+
+    async def _log_worker(self):
+        """Drain the log queue and flush batches in a single transaction"""
+        while True:
+            batch = [await self._log_queue.get()]
+            # Collect more entries until the batch fills up or the flush
+            # interval elapses, amortizing the commit across requests.
+            while len(batch) < self._log_batch_size:
+                try:
+                    batch.append(
+                        await asyncio.wait_for(
+                            self._log_queue.get(), timeout=self._log_flush_interval
+                        )
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush_log_batch(batch)
+            except Exception as e:
+                logger.error(f"Failed to flush log batch of {len(batch)}: {e}")
+
+    async def _flush_log_batch(self, batch: List[tuple]):
+        """Write a batch of queued log entries in one transaction"""
+        req_rows = [params for kind, params in batch if kind == "req"]
+        resp_rows = [params for kind, params in batch if kind == "resp"]
+
+        async with self._write_lock:
+            if req_rows:
+                await self._db.executemany(SQL_LOG_REQUEST, req_rows)
+            if resp_rows:
+                await self._db.executemany(SQL_LOG_RESPONSE, resp_rows)
+            await self._db.commit()
+
     async def get_user_history(self, user_id: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         """Get user's chat history"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("""
-                SELECT r.id, r.prompt, r.timestamp, res.response_data, res.processing_time
-                FROM requests r
-                LEFT JOIN responses res ON r.id = res.request_id
-                WHERE r.user_id = ?
-                ORDER BY r.timestamp DESC
-                LIMIT ? OFFSET ?
-            """, (user_id, limit, offset))
-            
-            rows = await cursor.fetchall()
-            
-            history = []
-            for row in rows:
-                history.append({
-                    "id": row["id"],
-                    "prompt": row["prompt"],
-                    "timestamp": row["timestamp"],
-                    "response": json.loads(row["response_data"]) if row["response_data"] else None,
-                    "processing_time": row["processing_time"]
-                })
-            
-            return history
-    
+        cursor = await self._db.execute(SQL_USER_HISTORY, (user_id, limit, offset))
+        cursor.row_factory = aiosqlite.Row
+
+        rows = await cursor.fetchall()
+
+        history = []
+        for row in rows:
+            history.append({
+                "id": row["id"],
+                "prompt": row["prompt"],
+                "timestamp": row["timestamp"],
+                "response": orjson.loads(row["response_data"]) if row["response_data"] else None,
+                "processing_time": row["processing_time"]
+            })
+
+        return history
+
+    async def get_user_history_count(self, user_id: str) -> int:
+        """Get total number of requests for a user"""
+        cache_key = f"stats:history_count:{user_id}"
+        cached = await self._cached_count(cache_key)
+        if cached is not None:
+            return cached
+
+        cursor = await self._db.execute(SQL_USER_HISTORY_COUNT, (user_id,))
+        result = await cursor.fetchone()
+        count = result[0] if result else 0
+
+        await self._cache_count(cache_key, count, ttl=10)
+        return count
+
+    async def _cached_count(self, key: str) -> Optional[int]:
+        """Read a cached counter from Redis, tolerating Redis being down"""
+        if not self.redis:
+            return None
+        try:
+            value = await self.redis.get(key)
+            return int(value) if value is not None else None
+        except Exception:
+            return None
+
+    async def _cache_count(self, key: str, value: int, ttl: int):
+        """Store a counter in Redis with a TTL, ignoring Redis failures"""
+        if not self.redis:
+            return
+        try:
+            await self.redis.set(key, value, ex=ttl)
+        except Exception:
+            pass
+
     async def get_requests_today(self) -> int:
         """Get number of requests today"""
-        today = datetime.now().date()
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                "SELECT COUNT(*) FROM requests WHERE DATE(timestamp) = ?",
-                (today,)
-            )
-            result = await cursor.fetchone()
-            return result[0] if result else 0
-    
+        cached = await self._cached_count("stats:req_today")
+        if cached is not None:
+            return cached
+
+        # Half-open range instead of DATE(timestamp) so the index is usable
+        today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+        tomorrow_start = today_start + timedelta(days=1)
+
+        cursor = await self._db.execute(SQL_REQUESTS_TODAY, (today_start, tomorrow_start))
+        result = await cursor.fetchone()
+        count = result[0] if result else 0
+
+        await self._cache_count("stats:req_today", count, ttl=30)
+        return count
+
     async def get_active_users_count(self) -> int:
         """Get count of users active in last 24 hours"""
+        cached = await self._cached_count("stats:active_users")
+        if cached is not None:
+            return cached
+
         yesterday = datetime.now() - timedelta(days=1)
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                "SELECT COUNT(DISTINCT user_id) FROM requests WHERE timestamp > ?",
-                (yesterday,)
-            )
-            result = await cursor.fetchone()
-            return result[0] if result else 0
-    
+
+        cursor = await self._db.execute(SQL_ACTIVE_USERS, (yesterday,))
+        result = await cursor.fetchone()
+        count = result[0] if result else 0
+
+        await self._cache_count("stats:active_users", count, ttl=60)
+        return count
+
     async def get_total_users(self) -> int:
         """Get total number of users"""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("SELECT COUNT(*) FROM users")
-            result = await cursor.fetchone()
-            return result[0] if result else 0
-    
+        cached = await self._cached_count("stats:total_users")
+        if cached is not None:
+            return cached
+
+        cursor = await self._db.execute("SELECT COUNT(*) FROM users")
+        result = await cursor.fetchone()
+        count = result[0] if result else 0
+
+        await self._cache_count("stats:total_users", count, ttl=60)
+        return count
+
     async def get_status(self) -> Dict[str, Any]:
         """Get database status"""
         return {
@@ -172,7 +297,34 @@ class DatabaseManager:
             "active_users": await self.get_active_users_count(),
             "database_path": self.db_path
         }
-    
+
     async def close(self):
         """Close database connections"""
-        logger.info("Database connections closed")
\ No newline at end of file
+        if self._log_task:
+            self._log_task.cancel()
+            try:
+                await self._log_task
+            except asyncio.CancelledError:
+                pass
+            self._log_task = None
+
+        # Flush anything still queued before closing the connection
+        if self._log_queue and not self._log_queue.empty():
+            pending = []
+            while not self._log_queue.empty():
+                pending.append(self._log_queue.get_nowait())
+            try:
+                await self._flush_log_batch(pending)
+            except Exception as e:
+                logger.error(f"Failed to flush pending log entries on close: {e}")
+
+        if self._db:
+            # Refresh planner statistics so the timestamp/user indexes keep
+            # being chosen as the tables grow
+            try:
+                await self._db.execute("PRAGMA optimize")
+            except Exception:
+                pass
+            await self._db.close()
+            self._db = None
+        logger.info("Database connections closed")
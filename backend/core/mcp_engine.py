@@ -11,6 +11,39 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Prefer orjson's C parser for the small JSON parameter dicts
+try:
+    import orjson
+    _jloads = orjson.loads
+except ImportError:
+    _jloads = json.loads
+
+# Shared parameter tables, built once instead of per parse. Treated as
+# read-only; callers get copies where mutation is possible.
+_DEFAULT_PARAMS = {
+    "weather": {"location": "London"},
+    "crypto": {"symbol": "bitcoin"},
+    "wiki": {"topic": "artificial intelligence"},
+    "search": {"query": "latest news"},
+    "joke": {},
+    "news": {"topic": "technology"}
+}
+
+# Dispatch table for structured tool results; plugins can register their
+# own formatter at import time instead of growing an if/elif chain
+_RESULT_FORMATTERS = {
+    "weather": lambda r: f"Weather: {r.get('description', 'N/A')}, {r.get('temperature', 'N/A')}",
+    "crypto": lambda r: f"Price: {r.get('price', 'N/A')}"
+}
+
+_POSITIONAL_KEY = {
+    "weather": "location",
+    "crypto": "symbol",
+    "wiki": "topic",
+    "search": "query",
+    "news": "topic"
+}
+
 class MCPEngine:
     """
     Advanced MCP engine with concurrent tool execution and error handling
@@ -19,6 +52,8 @@ class MCPEngine:
     def __init__(self, tool_manager):
         self.tool_manager = tool_manager
         self.tool_pattern = r'<tool>(\w+)(?:\(([^)]*)\))?</tool>'
+        # Compiled once; the bound-method calls skip the re module cache lookup
+        self._tool_re = re.compile(self.tool_pattern)
         self.max_concurrent_tools = 5
         self.tool_timeout = 30.0
     
@@ -30,6 +65,11 @@ class MCPEngine:
         """
         Process model response and execute tool calls
         """
+        # Cheap literal check keeps the regex engine out of the common
+        # no-tool-call path entirely
+        if "<tool>" not in model_response:
+            return []
+
         try:
             # Parse tool calls from response
             tool_calls = self._parse_tool_calls(model_response)
@@ -61,21 +101,23 @@ class MCPEngine:
         Enhanced parsing with parameter extraction
         """
         tool_calls = []
-        matches = re.findall(self.tool_pattern, text)
-        
-        for match in matches:
-            tool_name = match[0]
-            params_str = match[1] if len(match) > 1 else ""
-            
+
+        for m in self._tool_re.finditer(text):
+            tool_name = m.group(1)
+            params_str = m.group(2) or ""
+
             # Parse parameters
             params = self._parse_parameters(params_str, tool_name)
-            
+
+            # group(0) is the exact matched text, so raw_call can never
+            # diverge from what actually appears in the response
             tool_calls.append({
                 "tool": tool_name,
                 "params": params,
-                "raw_call": f"<tool>{tool_name}({params_str})</tool>"
+                "raw_call": m.group(0),
+                "span": m.span()
             })
-        
+
         return tool_calls
     
     def _parse_parameters(self, params_str: str, tool_name: str) -> Dict[str, Any]:
@@ -90,7 +132,7 @@ class MCPEngine:
         try:
             # Try JSON parsing first
             if params_str.startswith('{') and params_str.endswith('}'):
-                params = json.loads(params_str)
+                params = _jloads(params_str)
             else:
                 # Simple key=value or positional parsing
                 if '=' in params_str:
@@ -115,31 +157,16 @@ class MCPEngine:
         """
         Get default parameters for tools
         """
-        defaults = {
-            "weather": {"location": "London"},
-            "crypto": {"symbol": "bitcoin"},
-            "wiki": {"topic": "artificial intelligence"},
-            "search": {"query": "latest news"},
-            "joke": {},
-            "news": {"topic": "technology"}
-        }
-        
-        return defaults.get(tool_name, {})
-    
+        # Copy so downstream param tweaks can't corrupt the shared table
+        return dict(_DEFAULT_PARAMS.get(tool_name, {}))
+
     def _map_positional_param(self, tool_name: str, value: str) -> Dict[str, Any]:
         """
         Map positional parameters to named parameters
         """
-        mappings = {
-            "weather": {"location": value},
-            "crypto": {"symbol": value},
-            "wiki": {"topic": value},
-            "search": {"query": value},
-            "news": {"topic": value},
-            "joke": {}
-        }
-        
-        return mappings.get(tool_name, {"query": value})
+        if tool_name == "joke":
+            return {}
+        return {_POSITIONAL_KEY.get(tool_name, "query"): value}
     
     async def _execute_tools_concurrent(
         self,
@@ -150,30 +177,41 @@ class MCPEngine:
         """
         # Limit concurrent executions
         semaphore = asyncio.Semaphore(self.max_concurrent_tools)
-        
+
         async def execute_single_tool(tool_call):
             async with semaphore:
                 return await self._execute_single_tool(tool_call)
-        
-        # Execute all tools concurrently
-        tasks = [execute_single_tool(call) for call in tool_calls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results and handle exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    **tool_calls[i],
-                    "result": f"Tool execution failed: {str(result)}",
+
+        # TaskGroup gives structured cancellation; with the eager task
+        # factory enabled at startup, tools that finish without awaiting
+        # I/O never round-trip through the scheduler.
+        # _execute_single_tool already converts per-tool failures into
+        # result dicts, so the group only propagates programming errors.
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(execute_single_tool(call)) for call in tool_calls]
+
+            # One deadline for the whole batch rather than a wait_for per
+            # tool, so a single slow call can't stretch the batch beyond
+            # tool_timeout; stragglers are cancelled together, which also
+            # frees their connection-pool slots promptly
+            done, pending = await asyncio.wait(tasks, timeout=self.tool_timeout)
+            for task in pending:
+                task.cancel()
+
+        results = []
+        for tool_call, task in zip(tool_calls, tasks):
+            if task.cancelled():
+                results.append({
+                    **tool_call,
+                    "result": f"Tool execution timed out after {self.tool_timeout}s",
                     "success": False,
-                    "execution_time": 0.0,
-                    "error": str(result)
+                    "execution_time": self.tool_timeout,
+                    "error": "timeout"
                 })
             else:
-                processed_results.append(result)
-        
-        return processed_results
+                results.append(task.result())
+
+        return results
     
     async def _execute_single_tool(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -184,30 +222,19 @@ class MCPEngine:
         params = tool_call["params"]
         
         try:
-            # Execute with timeout
-            result = await asyncio.wait_for(
-                self.tool_manager.execute_tool(tool_name, params),
-                timeout=self.tool_timeout
-            )
-            
+            # The batch-level deadline in _execute_tools_concurrent
+            # handles timeouts, so no per-call wait_for here
+            result = await self.tool_manager.execute_tool(tool_name, params)
+
             execution_time = time.time() - start_time
-            
+
             return {
                 **tool_call,
                 "result": result,
                 "success": True,
                 "execution_time": execution_time
             }
-        
-        except asyncio.TimeoutError:
-            return {
-                **tool_call,
-                "result": f"Tool execution timed out after {self.tool_timeout}s",
-                "success": False,
-                "execution_time": self.tool_timeout,
-                "error": "timeout"
-            }
-        
+
         except Exception as e:
             execution_time = time.time() - start_time
             logger.error(f"Tool {tool_name} execution error: {e}")
@@ -228,36 +255,63 @@ class MCPEngine:
         """
         Format the final response by integrating tool results
         """
-        # Extract thought process (text before first tool call)
-        thought = self._extract_thought(original_response)
-        
-        # Replace tool calls with results in the response
-        final_answer = original_response
-        
-        for tool_call in tool_calls:
-            if tool_call["success"]:
-                replacement = self._format_tool_result(tool_call)
-                final_answer = final_answer.replace(
-                    tool_call["raw_call"],
-                    replacement
-                )
-            else:
-                final_answer = final_answer.replace(
-                    tool_call["raw_call"],
-                    f"[Error: {tool_call['result']}]"
-                )
-        
+        final_answer = "".join([
+            chunk async for chunk
+            in self.iter_final_response(original_response, tool_calls)
+        ])
+
+        # Thought is the text before the first tool call; reuse the spans
+        # rather than re-running the regex
+        if tool_calls:
+            first = min(call["span"][0] for call in tool_calls)
+            thought = original_response[:first].strip()
+            thought = thought if thought else "Let me help you with that."
+        else:
+            thought = self._extract_thought(original_response)
+
         return {
             "thought": thought,
             "final_answer": final_answer,
             "tool_summary": self._create_tool_summary(tool_calls)
         }
+
+    async def iter_final_response(
+        self,
+        original_response: str,
+        tool_calls: List[Dict[str, Any]]
+    ):
+        """
+        Yield the final answer as ordered text chunks
+
+        Splices tool results in by span in a single left-to-right pass
+        instead of one str.replace scan per call, which also keeps
+        identical tool calls from clobbering each other. Streaming
+        callers can forward the chunks without buffering the whole
+        response; format_final_response joins them for everyone else.
+        """
+        ordered = sorted(tool_calls, key=lambda call: call["span"][0])
+
+        cursor = 0
+        for tool_call in ordered:
+            start, end = tool_call["span"]
+            if start > cursor:
+                yield original_response[cursor:start]
+            if tool_call["success"]:
+                yield self._format_tool_result(tool_call)
+            else:
+                yield f"[Error: {tool_call['result']}]"
+            cursor = end
+        if cursor < len(original_response):
+            yield original_response[cursor:]
     
     def _extract_thought(self, response: str) -> str:
         """
         Extract the thinking process before tool calls
         """
-        match = re.search(self.tool_pattern, response)
+        if "<tool>" not in response:
+            return response
+
+        match = self._tool_re.search(response)
         if match:
             thought = response[:match.start()].strip()
             return thought if thought else "Let me help you with that."
@@ -268,32 +322,33 @@ class MCPEngine:
         """
         Format tool result for integration into final response
         """
-        tool_name = tool_call["tool"]
         result = tool_call["result"]
-        
+
         if isinstance(result, dict):
-            # Format structured results
-            if tool_name == "weather":
-                return f"Weather: {result.get('description', 'N/A')}, {result.get('temperature', 'N/A')}"
-            elif tool_name == "crypto":
-                return f"Price: {result.get('price', 'N/A')}"
-            else:
-                return str(result)
-        
+            formatter = _RESULT_FORMATTERS.get(tool_call["tool"])
+            if formatter:
+                return formatter(result)
+
         return str(result)
     
     def _create_tool_summary(self, tool_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Create a summary of tool executions
         """
-        successful = sum(1 for call in tool_calls if call["success"])
+        # One pass over the calls instead of three
+        successful = 0
+        total_time = 0.0
+        tools_used = []
+        for call in tool_calls:
+            tools_used.append(call["tool"])
+            total_time += call["execution_time"]
+            successful += call["success"]
         failed = len(tool_calls) - successful
-        total_time = sum(call["execution_time"] for call in tool_calls)
-        
+
         return {
             "total_tools": len(tool_calls),
             "successful": successful,
             "failed": failed,
             "total_execution_time": round(total_time, 3),
-            "tools_used": [call["tool"] for call in tool_calls]
+            "tools_used": tools_used
         }
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Rate Limiter with Redis sliding windows and a concurrent-request gate
+"""
+import time
+import logging
+from typing import Callable, Dict, List
+
+from fastapi import HTTPException, Request, status
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# Prune the window, count, conditionally record the hit and refresh the
+# expiry - all in one atomic round trip.
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local member = ARGV[4]
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+if redis.call('ZCARD', key) >= limit then
+    return 0
+end
+redis.call('ZADD', key, now, member)
+redis.call('EXPIRE', key, math.ceil(window))
+return 1
+"""
+
+# Concurrency gate: stale members (crashed requests) age out with the window.
+CONCURRENT_GATE_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local member = ARGV[4]
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+if redis.call('ZCARD', key) >= limit then
+    return 0
+end
+redis.call('ZADD', key, now, member)
+redis.call('EXPIRE', key, math.ceil(window))
+return 1
+"""
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter backed by Redis Lua scripts
+
+    Each check is a single atomic round trip. When Redis is unavailable the
+    limiter degrades to an in-process sliding window so the API stays up.
+    """
+
+    def __init__(self, redis_url: str = "redis://localhost:6379/0", max_concurrent: int = 5):
+        self.redis_url = redis_url
+        self.max_concurrent = max_concurrent
+        self.concurrent_window = 60.0
+        self._redis = None
+        self._window_script = None
+        self._gate_script = None
+        # In-memory fallback state (per-process, best effort)
+        self._local_hits: Dict[str, List[float]] = {}
+        self._local_concurrent: Dict[str, int] = {}
+
+    async def initialize(self):
+        """Connect to Redis and register the Lua scripts"""
+        try:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            await self._redis.ping()
+            self._window_script = self._redis.register_script(SLIDING_WINDOW_LUA)
+            self._gate_script = self._redis.register_script(CONCURRENT_GATE_LUA)
+            logger.info("Rate limiter connected to Redis")
+        except Exception as e:
+            logger.warning(f"Rate limiter falling back to in-memory windows: {e}")
+            self._redis = None
+
+    async def close(self):
+        """Close the Redis connection"""
+        if self._redis:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def hit(self, key: str, limit: int, window: float) -> bool:
+        """Record a hit; return False when the key is over its limit"""
+        now = time.time()
+
+        if self._window_script:
+            try:
+                allowed = await self._window_script(
+                    keys=[key], args=[now, window, limit, f"{now:.6f}"]
+                )
+                return bool(allowed)
+            except Exception as e:
+                logger.warning(f"Redis rate-limit check failed, allowing request: {e}")
+                return True
+
+        hits = [t for t in self._local_hits.get(key, []) if t > now - window]
+        if len(hits) >= limit:
+            self._local_hits[key] = hits
+            return False
+        hits.append(now)
+        self._local_hits[key] = hits
+        return True
+
+    async def acquire_slot(self, key: str, member: str) -> bool:
+        """Claim a concurrent-request slot; return False when all are taken"""
+        now = time.time()
+
+        if self._gate_script:
+            try:
+                allowed = await self._gate_script(
+                    keys=[f"concur:{key}"],
+                    args=[now, self.concurrent_window, self.max_concurrent, member]
+                )
+                return bool(allowed)
+            except Exception as e:
+                logger.warning(f"Redis concurrency check failed, allowing request: {e}")
+                return True
+
+        if self._local_concurrent.get(key, 0) >= self.max_concurrent:
+            return False
+        self._local_concurrent[key] = self._local_concurrent.get(key, 0) + 1
+        return True
+
+    async def release_slot(self, key: str, member: str):
+        """Release a previously acquired concurrent-request slot"""
+        if self._redis:
+            try:
+                await self._redis.zrem(f"concur:{key}", member)
+            except Exception:
+                pass
+            return
+
+        count = self._local_concurrent.get(key, 0)
+        if count > 0:
+            self._local_concurrent[key] = count - 1
+
+    def ip_limit(self, scope: str, limit: int, window: float) -> Callable:
+        """FastAPI dependency enforcing a per-client-IP sliding window"""
+        async def dependency(request: Request):
+            client_ip = request.client.host if request.client else "unknown"
+            if not await self.hit(f"rl:{scope}:{client_ip}", limit, window):
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Rate limit exceeded"
+                )
+        return dependency
+
+    async def check_user(self, scope: str, user_id: str, limit: int, window: float):
+        """Enforce a per-user sliding window, raising 429 when exceeded"""
+        if not await self.hit(f"rl:{scope}:{user_id}", limit, window):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded"
+            )
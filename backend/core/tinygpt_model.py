@@ -5,13 +5,33 @@ Lightweight GPT-style model with intelligent intent detection
 import asyncio
 import time
 import json
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import logging
-from transformers import GPT2LMHeadModel, GPT2Tokenizer
+from transformers import GPT2LMHeadModel, GPT2TokenizerFast
 import torch
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+_TOOL_DESCRIPTIONS = {
+    "weather": "use <tool>weather</tool> to get weather information",
+    "crypto": "use <tool>crypto</tool> to get cryptocurrency prices",
+    "wiki": "use <tool>wiki</tool> to get Wikipedia information",
+    "search": "use <tool>search</tool> to search for information",
+    "joke": "use <tool>joke</tool> to get a joke",
+    "news": "use <tool>news</tool> to get news"
+}
+
+@lru_cache(maxsize=128)
+def _tools_blurb(tools: tuple) -> str:
+    """Joined description string, cached per tool combination"""
+    return ", ".join(_TOOL_DESCRIPTIONS.get(tool, tool) for tool in tools)
+
 class TinyGPTModel:
     """
     Lightweight GPT model with tool-calling capabilities
@@ -34,21 +54,56 @@ class TinyGPTModel:
             "joke": ["joke", "funny", "humor", "laugh", "amusing", "comedy"],
             "news": ["news", "headlines", "current events", "breaking", "latest news"]
         }
-    
+
+        # Keyword matching scans the prompt once via an Aho-Corasick
+        # automaton instead of one str-contains pass per keyword;
+        # pyahocorasick is optional, with a compiled alternation regex
+        # covering its absence.
+        self._kw_to_tool = {
+            kw.lower(): tool
+            for tool, kws in self.tool_patterns.items()
+            for kw in kws
+        }
+        if ahocorasick is not None:
+            self._kw_automaton = ahocorasick.Automaton()
+            for kw, tool in self._kw_to_tool.items():
+                self._kw_automaton.add_word(kw, tool)
+            self._kw_automaton.make_automaton()
+        else:
+            self._kw_automaton = None
+        # Fallback path: single-word keywords resolve with one hashed set
+        # intersection over the split prompt; only the few multi-word
+        # keywords still need a substring check.
+        self._single_kw_to_tool = {
+            kw: tool for kw, tool in self._kw_to_tool.items() if " " not in kw
+        }
+        self._multi_kws = tuple(
+            (kw, tool) for kw, tool in self._kw_to_tool.items() if " " in kw
+        )
+
     async def initialize(self):
         """Initialize the model and tokenizer"""
         try:
             logger.info(f"Loading TinyGPT model: {self.model_name}")
             
-            # Load tokenizer
-            self.tokenizer = GPT2Tokenizer.from_pretrained(self.model_name)
+            # Load tokenizer (the Rust-backed fast variant; same API)
+            self.tokenizer = GPT2TokenizerFast.from_pretrained(self.model_name)
             self.tokenizer.pad_token = self.tokenizer.eos_token
             
             # Load model
             self.model = GPT2LMHeadModel.from_pretrained(self.model_name)
             self.model.to(self.device)
             self.model.eval()
-            
+
+            if self.device == "cuda":
+                # BF16 weights halve memory bandwidth on the GEMMs; CPU
+                # stays FP32 since BF16 wins need AVX-512-BF16/AMX
+                self.model = self.model.to(dtype=torch.bfloat16)
+                try:
+                    self.model = torch.compile(self.model, mode="reduce-overhead")
+                except Exception as e:
+                    logger.warning("torch.compile unavailable, running eager: %s", e)
+
             self.is_loaded = True
             logger.info(f"TinyGPT model loaded successfully on {self.device}")
             
@@ -74,16 +129,17 @@ class TinyGPTModel:
             detected_tools = self._detect_tools(prompt)
             
             if self.is_loaded and self.model:
-                # Use actual model for text generation
-                response_text = await self._generate_with_model(
+                # Use actual model for text generation; the token count
+                # comes straight from the generated IDs, avoiding a second
+                # BPE pass over the response
+                response_text, tokens_used = await self._generate_with_model(
                     prompt, temperature, max_tokens, detected_tools
                 )
             else:
                 # Use pattern-based fallback
                 response_text = self._generate_pattern_response(prompt, detected_tools)
-            
-            tokens_used = len(self.tokenizer.encode(response_text)) if self.tokenizer else len(response_text.split())
-            
+                tokens_used = len(response_text.split())
+
             return {
                 "text": response_text,
                 "model_info": {
@@ -107,21 +163,62 @@ class TinyGPTModel:
                 "detected_tools": ["search"]
             }
     
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        chunk_words: int = 8,
+        **kwargs
+    ):
+        """
+        Generate a response as a stream of text chunks
+
+        Yields {"type": "token", "text": ...} events for each chunk of the
+        response, followed by a final {"type": "complete", "result": ...}
+        event carrying the full generation result for tool processing.
+        """
+        result = await self.generate(
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+
+        words = result["text"].split(" ")
+        for i in range(0, len(words), chunk_words):
+            yield {"type": "token", "text": " ".join(words[i:i + chunk_words]) + " "}
+            # Yield control so chunks flush to the client as they're produced
+            await asyncio.sleep(0)
+
+        yield {"type": "complete", "result": result}
+
     def _detect_tools(self, prompt: str) -> List[str]:
         """
         Detect which tools should be called based on the prompt
         """
         prompt_lower = prompt.lower()
-        detected = []
-        
-        for tool, keywords in self.tool_patterns.items():
-            if any(keyword in prompt_lower for keyword in keywords):
-                detected.append(tool)
-        
+
+        if self._kw_automaton is not None:
+            hits = (tool for _, tool in self._kw_automaton.iter(prompt_lower))
+        else:
+            tokens = set(prompt_lower.split())
+            matched = {
+                self._single_kw_to_tool[t]
+                for t in tokens & self._single_kw_to_tool.keys()
+            }
+            matched.update(
+                tool for kw, tool in self._multi_kws if kw in prompt_lower
+            )
+            hits = matched
+
+        # dict.fromkeys dedupes while keeping first-hit order stable
+        detected = list(dict.fromkeys(hits))
+
         # If no specific tools detected, default to search
         if not detected:
             detected.append("search")
-        
+
         return detected
     
     async def _generate_with_model(
@@ -130,28 +227,38 @@ class TinyGPTModel:
         temperature: float,
         max_tokens: int,
         detected_tools: List[str]
-    ) -> str:
+    ) -> tuple:
         """
         Generate response using the actual GPT model
+
+        Returns (response_text, tokens_generated).
         """
         try:
             # Create enhanced prompt with tool awareness
             enhanced_prompt = self._create_tool_aware_prompt(prompt, detected_tools)
             
-            # Tokenize
-            inputs = self.tokenizer.encode(enhanced_prompt, return_tensors="pt").to(self.device)
-            
-            # Generate
-            with torch.no_grad():
+            # Tokenize; one call yields input_ids plus the attention mask,
+            # so no separate full-ones tensor gets allocated per request
+            enc = self.tokenizer(enhanced_prompt, return_tensors="pt").to(self.device)
+
+            # Generate; inference_mode skips autograd version-counter
+            # bookkeeping that no_grad still pays for
+            with torch.inference_mode(), torch.autocast(
+                device_type="cuda",
+                dtype=torch.bfloat16,
+                enabled=(self.device == "cuda")
+            ):
                 outputs = self.model.generate(
-                    inputs,
-                    max_length=inputs.shape[1] + max_tokens,
+                    **enc,
+                    max_new_tokens=max_tokens,
                     temperature=temperature,
                     do_sample=True,
                     pad_token_id=self.tokenizer.eos_token_id,
-                    attention_mask=torch.ones_like(inputs)
+                    use_cache=True
                 )
-            
+
+            n_new_tokens = outputs.shape[1] - enc["input_ids"].shape[1]
+
             # Decode response
             generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
             
@@ -161,28 +268,20 @@ class TinyGPTModel:
             # Add tool calls if not present
             if not any(f"<tool>{tool}" in response for tool in detected_tools):
                 response = self._add_tool_calls(response, detected_tools)
-            
-            return response
-            
+
+            return response, n_new_tokens
+
         except Exception as e:
             logger.error(f"Model generation error: {e}")
-            return self._generate_pattern_response(prompt, detected_tools)
+            response = self._generate_pattern_response(prompt, detected_tools)
+            return response, len(response.split())
     
     def _create_tool_aware_prompt(self, prompt: str, detected_tools: List[str]) -> str:
         """
         Create a prompt that encourages tool usage
         """
-        tool_descriptions = {
-            "weather": "use <tool>weather</tool> to get weather information",
-            "crypto": "use <tool>crypto</tool> to get cryptocurrency prices",
-            "wiki": "use <tool>wiki</tool> to get Wikipedia information",
-            "search": "use <tool>search</tool> to search for information",
-            "joke": "use <tool>joke</tool> to get a joke",
-            "news": "use <tool>news</tool> to get news"
-        }
-        
-        available_tools = ", ".join([tool_descriptions.get(tool, tool) for tool in detected_tools])
-        
+        available_tools = _tools_blurb(tuple(sorted(detected_tools)))
+
         enhanced_prompt = f"""You are TinyGPT, an AI assistant with access to tools. When users ask questions, you can {available_tools}.
 
 User: {prompt}
@@ -4,22 +4,132 @@ Tool Manager - Plugin-ready architecture for dynamic tool management
 import asyncio
 import importlib
 import os
+from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
 import logging
 from abc import ABC, abstractmethod
 
+import httpx
+import orjson
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter
+)
+
 logger = logging.getLogger(__name__)
 
+# Hosts the built-in tools talk to; used to pre-warm connections
+_KNOWN_HOSTS = (
+    "https://api.coingecko.com",
+    "https://v2.jokeapi.dev",
+    "https://newsapi.org",
+    "https://api.duckduckgo.com",
+    "http://api.openweathermap.org",
+    "https://en.wikipedia.org"
+)
+
+@dataclass(slots=True)
+class ToolStat:
+    """Per-tool execution counters; slots keep updates off the dict path
+
+    Only the running total is kept on the hot path; the mean is derived
+    when status is read.
+    """
+    executions: int = 0
+    successes: int = 0
+    failures: int = 0
+    total_time: float = 0.0
+
 class BaseTool(ABC):
     """
     Base class for all tools with plugin architecture
     """
-    
+
+    # Alias -> canonical parameter name. The manager folds aliases in
+    # once before dispatch, so execute() sees canonical keys only and
+    # aliased calls share one cache entry.
+    _PARAM_ALIASES: Dict[str, str] = {}
+
+    # One keep-alive HTTP/2 client shared by every tool instance. A fresh
+    # AsyncClient per call pays a TCP+TLS handshake each time; pooling the
+    # connections makes repeat calls to the same API host near-free, and
+    # HTTP/2 multiplexes concurrent calls onto a single connection.
+    _http: Optional[httpx.AsyncClient] = None
+
     def __init__(self):
         self.name = self.__class__.__name__.lower().replace('tool', '')
         self.enabled = True
         self.category = "general"
         self.version = "1.0.0"
+        if BaseTool._http is None:
+            # Transport-level retries cover transient connect failures;
+            # the 5-minute keepalive expiry keeps idle connections alive
+            # between request bursts instead of re-handshaking
+            BaseTool._http = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(
+                    retries=2,
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=100,
+                        max_keepalive_connections=20,
+                        keepalive_expiry=300
+                    )
+                ),
+                timeout=10.0
+            )
+
+    @classmethod
+    async def warmup(cls):
+        """Pre-open connections to the known tool API hosts
+
+        Resolves DNS and performs the TCP/TLS handshakes off the request
+        path so the first real tool call starts on a warm connection.
+        Failures are ignored; unreachable hosts just warm up lazily.
+        """
+        if cls._http is None:
+            return
+        await asyncio.gather(
+            *(cls._http.head(host) for host in _KNOWN_HOSTS),
+            return_exceptions=True
+        )
+
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP client; called from app shutdown"""
+        if cls._http is not None:
+            await cls._http.aclose()
+            cls._http = None
+
+    @retry(
+        wait=wait_exponential_jitter(initial=0.1, max=2),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(
+            (httpx.TimeoutException, httpx.TransportError)
+        ),
+        reraise=True
+    )
+    async def _get_with_retry(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the shared client with exponential-backoff retries
+
+        Only timeouts and transport failures are retried; HTTP error
+        statuses come back to the caller. The jittered backoff keeps a
+        briefly degraded upstream from being hammered in lockstep.
+        """
+        return await self._http.get(url, **kwargs)
+
+    @staticmethod
+    def _parse_json(response: httpx.Response) -> Any:
+        """Decode a JSON response with orjson
+
+        Takes the raw bytes straight from httpx, skipping both the
+        str decode and the slower stdlib parser behind response.json().
+        The tool APIs bound their own payloads (wiki hits the summary
+        endpoint, news requests pageSize=3), so a one-shot parse of the
+        full body beats an incremental parser here.
+        """
+        return orjson.loads(response.content)
     
     @abstractmethod
     async def execute(self, params: Dict[str, Any]) -> Any:
@@ -40,6 +150,18 @@ class BaseTool(ABC):
         """Validate parameters before execution"""
         return True
 
+    def normalize_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fold parameter aliases into their canonical names"""
+        aliases = self._PARAM_ALIASES
+        if not aliases or not any(alias in params for alias in aliases):
+            return params
+
+        normalized = dict(params)
+        for alias, canonical in aliases.items():
+            if alias in normalized and canonical not in normalized:
+                normalized[canonical] = normalized.pop(alias)
+        return normalized
+
 class ToolManager:
     """
     Advanced tool manager with plugin support and dynamic loading
@@ -47,8 +169,15 @@ class ToolManager:
     
     def __init__(self):
         self.tools: Dict[str, BaseTool] = {}
-        self.tool_stats: Dict[str, Dict[str, Any]] = {}
+        self.tool_stats: Dict[str, ToolStat] = {}
         self.plugins_dir = "plugins"
+        # (mtime, classes) per plugin file so unchanged plugins skip
+        # re-execution on reload
+        self._plugin_cache: Dict[str, tuple] = {}
+        # Serialized /tools payload; rebuilt only after a toggle or reload
+        self._tools_cache: Optional[List[Dict[str, Any]]] = None
+        # Bumped whenever the tool set changes; used for ETag revalidation
+        self.tools_version = 1
     
     async def initialize(self):
         """Initialize tool manager and load all tools"""
@@ -82,48 +211,57 @@ class ToolManager:
         
         for tool in builtin_tools:
             self.tools[tool.name] = tool
-            self.tool_stats[tool.name] = {
-                "executions": 0,
-                "successes": 0,
-                "failures": 0,
-                "avg_execution_time": 0.0
-            }
+            self.tool_stats[tool.name] = ToolStat()
     
     async def _load_plugin_tools(self):
         """Load plugin tools dynamically"""
         if not os.path.exists(self.plugins_dir):
             return
         
-        for filename in os.listdir(self.plugins_dir):
-            if filename.endswith('.py') and not filename.startswith('_'):
+        # scandir hands back stat info without a second syscall per file
+        with os.scandir(self.plugins_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.py') or entry.name.startswith('_'):
+                    continue
                 try:
-                    module_name = filename[:-3]
-                    spec = importlib.util.spec_from_file_location(
-                        module_name,
-                        os.path.join(self.plugins_dir, filename)
-                    )
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    
-                    # Look for tool classes
-                    for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if (isinstance(attr, type) and 
-                            issubclass(attr, BaseTool) and 
-                            attr != BaseTool):
-                            
-                            tool = attr()
-                            self.tools[tool.name] = tool
-                            self.tool_stats[tool.name] = {
-                                "executions": 0,
-                                "successes": 0,
-                                "failures": 0,
-                                "avg_execution_time": 0.0
-                            }
-                            logger.info(f"Loaded plugin tool: {tool.name}")
-                
+                    mtime = entry.stat().st_mtime
+                    cached = self._plugin_cache.get(entry.name)
+                    if cached and cached[0] == mtime:
+                        tool_classes = cached[1]
+                    else:
+                        tool_classes = self._load_plugin_classes(entry.name, entry.path)
+                        self._plugin_cache[entry.name] = (mtime, tool_classes)
+
+                    for tool_class in tool_classes:
+                        tool = tool_class()
+                        tool._is_plugin = True
+                        self.tools[tool.name] = tool
+                        self.tool_stats[tool.name] = ToolStat()
+                        logger.info(f"Loaded plugin tool: {tool.name}")
+
                 except Exception as e:
-                    logger.error(f"Failed to load plugin {filename}: {e}")
+                    logger.error(f"Failed to load plugin {entry.name}: {e}")
+
+    def _load_plugin_classes(self, filename: str, path: str) -> List[type]:
+        """Execute a plugin module and collect its tool classes"""
+        module_name = filename[:-3]
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        # Plugins can export their tools explicitly, skipping the dir() scan
+        exported = getattr(module, "__tools__", None)
+        if exported is not None:
+            return list(exported)
+
+        tool_classes = []
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            if (isinstance(attr, type) and
+                issubclass(attr, BaseTool) and
+                attr is not BaseTool):
+                tool_classes.append(attr)
+        return tool_classes
     
     async def execute_tool(self, tool_name: str, params: Dict[str, Any]) -> Any:
         """
@@ -137,39 +275,78 @@ class ToolManager:
         if not tool.enabled:
             raise ValueError(f"Tool '{tool_name}' is disabled")
         
+        # Normalize aliases once here so the tools (and their caches)
+        # only ever see canonical parameter names
+        params = tool.normalize_params(params)
+
         # Validate parameters
         if not tool.validate_params(params):
             raise ValueError(f"Invalid parameters for tool '{tool_name}'")
         
         # Update statistics
-        self.tool_stats[tool_name]["executions"] += 1
-        
+        stats = self.tool_stats[tool_name]
+        stats.executions += 1
+
         try:
             import time
             start_time = time.time()
-            
+
             result = await tool.execute(params)
-            
+
             execution_time = time.time() - start_time
-            self.tool_stats[tool_name]["successes"] += 1
-            
-            # Update average execution time
-            stats = self.tool_stats[tool_name]
-            stats["avg_execution_time"] = (
-                (stats["avg_execution_time"] * (stats["successes"] - 1) + execution_time) /
-                stats["successes"]
-            )
-            
+            stats.successes += 1
+            stats.total_time += execution_time
+
             return result
-        
+
         except Exception as e:
-            self.tool_stats[tool_name]["failures"] += 1
+            stats.failures += 1
             logger.error(f"Tool {tool_name} execution failed: {e}")
             raise
     
+    async def execute_many(
+        self,
+        calls: List[tuple],
+        max_concurrent: int = 8
+    ) -> List[Any]:
+        """
+        Execute independent (tool_name, params) calls concurrently
+
+        The calls are network-bound, so fanning out turns the batch
+        latency into the slowest call rather than the sum. A semaphore
+        caps the fan-out so a burst can't trip the upstream APIs' rate
+        limits, and return_exceptions keeps one failure from sinking the
+        rest; results come back in call order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def run(tool_name: str, params: Dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self.execute_tool(tool_name, params)
+
+        return await asyncio.gather(
+            *(run(tool_name, params) for tool_name, params in calls),
+            return_exceptions=True
+        )
+
     def get_available_tools(self) -> List[BaseTool]:
         """Get list of available tools"""
         return list(self.tools.values())
+
+    def get_available_tools_serialized(self) -> List[Dict[str, Any]]:
+        """Get the serialized tool listing, cached until a tool changes"""
+        if self._tools_cache is None:
+            self._tools_cache = [
+                {
+                    "name": tool.name,
+                    "description": tool.get_description(),
+                    "parameters": tool.get_parameters(),
+                    "category": tool.category,
+                    "enabled": tool.enabled
+                }
+                for tool in self.tools.values()
+            ]
+        return self._tools_cache
     
     def get_tool(self, tool_name: str) -> Optional[BaseTool]:
         """Get a specific tool"""
@@ -182,7 +359,9 @@ class ToolManager:
         
         tool = self.tools[tool_name]
         tool.enabled = not tool.enabled
-        
+        self._tools_cache = None
+        self.tools_version += 1
+
         logger.info(f"Tool {tool_name} {'enabled' if tool.enabled else 'disabled'}")
         return tool.enabled
     
@@ -194,7 +373,15 @@ class ToolManager:
             "total_tools": len(self.tools),
             "enabled_tools": enabled_tools,
             "disabled_tools": len(self.tools) - enabled_tools,
-            "tool_stats": self.tool_stats,
+            "tool_stats": {
+                name: {
+                    "executions": st.executions,
+                    "successes": st.successes,
+                    "failures": st.failures,
+                    "avg_execution_time": st.total_time / st.successes if st.successes else 0.0
+                }
+                for name, st in self.tool_stats.items()
+            },
             "categories": list(set(tool.category for tool in self.tools.values()))
         }
     
@@ -212,5 +399,7 @@ class ToolManager:
         
         # Reload plugins
         await self._load_plugin_tools()
-        
+        self._tools_cache = None
+        self.tools_version += 1
+
         logger.info("Plugin tools reloaded")
\ No newline at end of file
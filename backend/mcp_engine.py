@@ -5,7 +5,7 @@ Handles parsing and execution of tool calls from TinyGPT responses
 import re
 import json
 from typing import List, Dict, Any, Optional
-from tools import ToolRegistry
+from tools import get_registry
 
 class MCPEngine:
     """
@@ -14,21 +14,44 @@ class MCPEngine:
     """
     
     def __init__(self):
-        self.tool_registry = ToolRegistry()
+        self.tool_registry = get_registry()
         self.tool_call_pattern = r'<tool>(\w+)\(([^)]*)\)</tool>'
+        # Compiled once so per-call parsing skips the re module cache
+        self.tool_call_re = re.compile(self.tool_call_pattern)
+        # Formatter per tool, looked up in O(1) instead of walking an
+        # if/elif ladder for every result
+        self._formatters = {
+            "weather": lambda r: (
+                f"The weather information: {r}"
+                if isinstance(r, dict) and "temperature" in str(r) else str(r)
+            ),
+            "crypto_price": lambda r: (
+                f"Current price: {r}" if isinstance(r, dict) else str(r)
+            ),
+            "wiki": lambda r: f"Wikipedia summary: {r}",
+            "search": lambda r: f"Search results: {r}",
+            "joke": str,
+            "news": lambda r: f"Latest news: {r}"
+        }
     
     def parse_tool_calls(self, text: str) -> List[Dict[str, Any]]:
         """
         Parse tool calls from TinyGPT output
         Returns list of tool call dictionaries
         """
+        # Literal substring check bypasses the regex engine entirely on
+        # the common no-tool-call path
+        if "<tool>" not in text:
+            return []
+
         tool_calls = []
-        matches = re.findall(self.tool_call_pattern, text)
-        
-        for match in matches:
-            function_name = match[0]
-            args_string = match[1]
-            
+
+        # finditer avoids materializing a tuple list up front and lets us
+        # record match positions, so later passes never re-scan the text
+        for m in self.tool_call_re.finditer(text):
+            function_name = m.group(1)
+            args_string = m.group(2)
+
             # Parse arguments
             try:
                 # Handle quoted arguments
@@ -37,93 +60,124 @@ class MCPEngine:
                     args = self._parse_arguments(args_string)
                 else:
                     args = {}
-                
+
                 tool_calls.append({
                     "function": function_name,
                     "arguments": args,
-                    "raw_call": f"<tool>{function_name}({args_string})</tool>"
+                    "raw_call": m.group(0),
+                    "span": m.span()
                 })
             except Exception as e:
                 print(f"Error parsing tool call arguments: {e}")
                 continue
-        
+
         return tool_calls
     
     def _parse_arguments(self, args_string: str) -> Dict[str, Any]:
-        """Parse function arguments from string"""
+        """Parse function arguments from string
+
+        One character-level pass that tracks quote state, so commas inside
+        quoted values no longer split them and each key/value is sliced
+        out exactly once instead of going through repeated strip/split.
+        """
         args = {}
-        
-        # Remove quotes and split by comma if multiple args
-        cleaned_args = args_string.strip().strip('"\'')
-        
-        if not cleaned_args:
+
+        s = args_string.strip()
+        if not s:
             return args
-        
-        # For now, assume single argument functions
-        # In production, implement proper argument parsing
-        if '=' in cleaned_args:
-            # Named arguments: key=value
-            pairs = cleaned_args.split(',')
-            for pair in pairs:
-                if '=' in pair:
-                    key, value = pair.split('=', 1)
-                    args[key.strip()] = value.strip().strip('"\'')
-        else:
+
+        if '=' not in s:
             # Positional argument - map to first parameter of function
-            args['query'] = cleaned_args  # Default parameter name
-        
+            args['query'] = s.strip('"\'')  # Default parameter name
+            return args
+
+        # Named arguments: key=value pairs separated by top-level commas
+        key_start = 0
+        eq_pos = -1
+        quote = ""
+        for i, ch in enumerate(s):
+            if quote:
+                if ch == quote:
+                    quote = ""
+            elif ch in "\"'":
+                quote = ch
+            elif ch == '=' and eq_pos < key_start:
+                eq_pos = i
+            elif ch == ',' and eq_pos >= key_start:
+                key = s[key_start:eq_pos].strip()
+                if key:
+                    args[key] = s[eq_pos + 1:i].strip().strip('"\'')
+                key_start = i + 1
+
+        if eq_pos >= key_start:
+            key = s[key_start:eq_pos].strip()
+            if key:
+                args[key] = s[eq_pos + 1:].strip().strip('"\'')
+
         return args
     
     async def execute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Execute all tool calls and return results
+
+        The calls are independent HTTP requests, so they run concurrently
+        under the registry's batch budget; total latency is the slowest
+        call rather than the sum, and order is preserved.
         """
+        raw = await self.tool_registry.batch_execute(tool_calls)
+
         results = []
-        
-        for tool_call in tool_calls:
-            function_name = tool_call["function"]
-            arguments = tool_call["arguments"]
-            
-            try:
-                # Execute the tool
-                result = await self.tool_registry.execute_tool(function_name, arguments)
-                
+        for tool_call, result in zip(tool_calls, raw):
+            if isinstance(result, Exception):
                 results.append({
-                    "function": function_name,
-                    "arguments": arguments,
-                    "result": result,
-                    "success": True,
-                    "raw_call": tool_call["raw_call"]
+                    "function": tool_call["function"],
+                    "arguments": tool_call["arguments"],
+                    "result": f"Error: {str(result)}",
+                    "success": False,
+                    "raw_call": tool_call["raw_call"],
+                    "span": tool_call.get("span")
                 })
-            
-            except Exception as e:
+            else:
                 results.append({
-                    "function": function_name,
-                    "arguments": arguments,
-                    "result": f"Error: {str(e)}",
-                    "success": False,
-                    "raw_call": tool_call["raw_call"]
+                    "function": tool_call["function"],
+                    "arguments": tool_call["arguments"],
+                    "result": result,
+                    "success": True,
+                    "raw_call": tool_call["raw_call"],
+                    "span": tool_call.get("span")
                 })
-        
+
         return results
     
     def format_final_response(self, original_response: str, tool_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Format the final response by replacing tool calls with results
         """
-        # Start with the original response
-        final_text = original_response
-        
-        # Replace each tool call with its result
-        for result in tool_results:
+        # One regex pass over the response instead of a full str.replace
+        # scan per result
+        results_by_raw = {r["raw_call"]: r for r in tool_results}
+
+        def _replace(match):
+            result = results_by_raw.get(match.group(0))
+            if result is None:
+                return match.group(0)
             if result["success"]:
-                replacement = self._format_tool_result(result)
-                final_text = final_text.replace(result["raw_call"], replacement)
-            else:
-                final_text = final_text.replace(result["raw_call"], f"[Error: {result['result']}]")
-        
+                return self._format_tool_result(result)
+            return f"[Error: {result['result']}]"
+
+        final_text = self.tool_call_re.sub(_replace, original_response)
+
+        # Reuse the spans recorded during parsing for the thought instead
+        # of running the regex over the response again
+        starts = [r["span"][0] for r in tool_results if r.get("span")]
+        if starts:
+            thought = original_response[:min(starts)].strip()
+            thought = thought if thought else "Let me help you with that."
+        else:
+            thought = self._extract_thought(original_response)
+
         return {
-            "thought": self._extract_thought(original_response),
+            "thought": thought,
             "tool_calls": tool_results,
             "final_answer": final_text,
             "raw_response": original_response
@@ -131,8 +185,11 @@ class MCPEngine:
     
     def _extract_thought(self, response: str) -> str:
         """Extract the thinking part before tool calls"""
+        if "<tool>" not in response:
+            return response
+
         # Find the first tool call
-        match = re.search(self.tool_call_pattern, response)
+        match = self.tool_call_re.search(response)
         if match:
             thought = response[:match.start()].strip()
             return thought if thought else "Let me help you with that."
@@ -141,34 +198,9 @@ class MCPEngine:
     
     def _format_tool_result(self, result: Dict[str, Any]) -> str:
         """Format tool result for inclusion in final response"""
-        function_name = result["function"]
-        tool_result = result["result"]
-        
-        # Format based on tool type
-        if function_name == "weather":
-            if isinstance(tool_result, dict) and "temperature" in str(tool_result):
-                return f"The weather information: {tool_result}"
-            return str(tool_result)
-        
-        elif function_name == "crypto_price":
-            if isinstance(tool_result, dict):
-                return f"Current price: {tool_result}"
-            return str(tool_result)
-        
-        elif function_name == "wiki":
-            return f"Wikipedia summary: {tool_result}"
-        
-        elif function_name == "search":
-            return f"Search results: {tool_result}"
-        
-        elif function_name == "joke":
-            return str(tool_result)
-        
-        elif function_name == "news":
-            return f"Latest news: {tool_result}"
-        
-        else:
-            return str(tool_result)
+        # Dict dispatch on the tool name; unknown tools fall back to str
+        formatter = self._formatters.get(result["function"], str)
+        return formatter(result["result"])
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
         """Return list of available tools"""
@@ -1,6 +1,7 @@
 """
 Simple script to run the TinyGPT-MCP backend server
 """
+import argparse
 import subprocess
 import sys
 import os
@@ -10,30 +11,50 @@ def install_requirements():
     print("Installing requirements...")
     subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
 
-def run_server():
+def run_server(workers: int = 1):
     """Run the FastAPI server"""
+    import uvicorn
+
     print("Starting TinyGPT-MCP backend server...")
     print("Server will be available at: http://localhost:8000")
     print("API Documentation: http://localhost:8000/docs")
     print("\nPress Ctrl+C to stop the server\n")
-    
+
     try:
-        subprocess.run([sys.executable, "app.py"])
+        # Run uvicorn in-process instead of spawning a second interpreter;
+        # uvloop/httptools match the app's own entrypoint
+        uvicorn.run(
+            "app:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop",
+            http="httptools",
+            workers=workers
+        )
     except KeyboardInterrupt:
         print("\nServer stopped.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the TinyGPT-MCP backend server")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", "1")),
+        help="number of worker processes (set to the core count for multi-core scaling)"
+    )
+    args = parser.parse_args()
+
     # Check if we're in the backend directory
     if not os.path.exists("requirements.txt"):
         print("Error: Please run this script from the backend directory")
         sys.exit(1)
-    
+
     # Install requirements if needed
     try:
         import fastapi
         import uvicorn
     except ImportError:
         install_requirements()
-    
+
     # Run the server
-    run_server()
\ No newline at end of file
+    run_server(args.workers)
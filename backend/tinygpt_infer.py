@@ -2,164 +2,273 @@
 TinyGPT Inference Engine
 A lightweight text generation model with tool-calling capabilities
 """
-import random
 import re
+from collections import defaultdict
 from typing import List, Dict, Any
 
+# Capitalized words that are never city names
+_STOPWORDS = frozenset({"the", "and", "for", "what", "how"})
+
+# Intent flags OR'd into a single bitmask during the prompt scan
+_WEATHER, _CRYPTO, _WIKI, _SEARCH, _JOKE, _NEWS = (1 << i for i in range(6))
+_INTENT_BITS = {
+    "weather": _WEATHER,
+    "crypto": _CRYPTO,
+    "wikipedia": _WIKI,
+    "search": _SEARCH,
+    "joke": _JOKE,
+    "news": _NEWS
+}
+
+# Aliases -> CoinGecko ids, shared by every extraction call
+_CRYPTO_MAP = {
+    "bitcoin": "bitcoin",
+    "btc": "bitcoin",
+    "ethereum": "ethereum",
+    "eth": "ethereum",
+    "dogecoin": "dogecoin",
+    "doge": "dogecoin",
+    "cardano": "cardano",
+    "ada": "cardano",
+    "polkadot": "polkadot",
+    "dot": "polkadot"
+}
+
 class TinyGPT:
     """
     A simplified GPT-style model that can generate text responses
     and embed tool calls using the MCP format: <tool>function_name(args)</tool>
     """
-    
+
+    # Stop detection at the first matched intent — the typical chat
+    # prompt carries exactly one. Set False for multi-intent use.
+    return_on_first = True
+
     def __init__(self):
         self.model_name = "TinyGPT-v1.0"
         self.temperature = 0.7
-        
+
+        # Static payload for get_model_info, built once
+        self._model_info = {
+            "name": self.model_name,
+            "temperature": self.temperature,
+            "capabilities": [
+                "text_generation",
+                "tool_calling",
+                "context_understanding"
+            ]
+        }
+
         # Predefined response patterns for demonstration
         # In a real implementation, this would be replaced with actual model weights
         self.response_patterns = {
-            "weather": [
+            "weather": (
                 "Let me check the weather for you. <tool>weather({city})</tool>",
                 "I'll get the current weather conditions. <tool>weather({city})</tool>",
                 "Checking weather data... <tool>weather({city})</tool>"
-            ],
-            "crypto": [
+            ),
+            "crypto": (
                 "Let me fetch the latest cryptocurrency price. <tool>crypto_price({symbol})</tool>",
                 "I'll check the current market price. <tool>crypto_price({symbol})</tool>",
                 "Getting crypto market data... <tool>crypto_price({symbol})</tool>"
-            ],
-            "wikipedia": [
+            ),
+            "wikipedia": (
                 "I'll search Wikipedia for that information. <tool>wiki({topic})</tool>",
                 "Let me look that up on Wikipedia. <tool>wiki({topic})</tool>",
                 "Searching Wikipedia... <tool>wiki({topic})</tool>"
-            ],
-            "search": [
+            ),
+            "search": (
                 "Let me search for that information. <tool>search({query})</tool>",
                 "I'll find the latest information on that. <tool>search({query})</tool>",
                 "Searching the web... <tool>search({query})</tool>"
-            ],
-            "joke": [
+            ),
+            "joke": (
                 "Here's a joke for you! <tool>joke()</tool>",
                 "Let me tell you something funny! <tool>joke()</tool>",
                 "Time for some humor! <tool>joke()</tool>"
-            ],
-            "news": [
+            ),
+            "news": (
                 "Let me get the latest news on that topic. <tool>news({topic})</tool>",
                 "I'll fetch recent news articles. <tool>news({topic})</tool>",
                 "Checking current news... <tool>news({topic})</tool>"
-            ]
+            )
         }
-    
+
+        # The variants are interchangeable, so a round-robin cursor per
+        # intent rotates them without a PRNG call per request
+        self._pattern_cursors: Dict[str, int] = defaultdict(int)
+
+        # Placeholder key per intent type; joke patterns have none
+        self._pattern_keys = {
+            "weather": "city",
+            "crypto": "symbol",
+            "wikipedia": "topic",
+            "search": "query",
+            "news": "topic"
+        }
+        # Placeholder-free variants, pre-stripped once so the no-entity
+        # path doesn't pay two str.replace passes per call
+        self._bare_patterns = {
+            intent: tuple(
+                p.replace("({", "()").replace("})", ")") for p in patterns
+            )
+            for intent, patterns in self.response_patterns.items()
+        }
+
+        # Specialize each pattern/key pair into a closure at init time so
+        # the hot loop in generate_response is a dict lookup plus one call
+        # with no per-request branching
+        self._intent_fillers: Dict[str, tuple] = {}
+        for intent_type, patterns in self.response_patterns.items():
+            key = self._pattern_keys.get(intent_type)
+            bares = self._bare_patterns[intent_type]
+            fillers = []
+            for pat, bare in zip(patterns, bares):
+                if key:
+                    fillers.append(
+                        lambda intent, pat=pat, bare=bare, key=key:
+                            pat.format_map({key: f'"{intent[key]}"'})
+                            if intent.get(key) is not None else bare
+                    )
+                else:
+                    fillers.append(lambda intent, bare=bare: bare)
+            self._intent_fillers[intent_type] = tuple(fillers)
+
+        # Flat keyword -> intent table checked in one hashed pass over the
+        # prompt tokens; the few multi-word keywords keep a substring check
+        intent_keywords = {
+            "weather": ["weather", "temperature", "rain", "sunny", "cloudy", "forecast"],
+            "crypto": ["price", "crypto", "bitcoin", "ethereum", "btc", "eth", "coin"],
+            "wikipedia": ["wikipedia", "wiki", "summary", "information about", "tell me about"],
+            "search": ["search", "find", "who won", "latest", "recent"],
+            "joke": ["joke", "funny", "humor", "laugh", "amusing"],
+            "news": ["news", "headlines", "latest news", "current events"]
+        }
+        self._kw_to_bit = {
+            kw: _INTENT_BITS[intent]
+            for intent, kws in intent_keywords.items()
+            for kw in kws if " " not in kw
+        }
+        self._multi_kw_bits = tuple(
+            (kw, _INTENT_BITS[intent])
+            for intent, kws in intent_keywords.items()
+            for kw in kws if " " in kw
+        )
+
+        self._city_set = frozenset([
+            "paris", "london", "tokyo", "berlin", "madrid",
+            "rome", "moscow", "beijing", "sydney"
+        ])
+        self._multi_word_cities = ("new york",)
+
+        # Topic-extraction patterns, compiled once instead of per call
+        self._wiki_patterns = [re.compile(p) for p in (
+            r'about\s+([^.?!]+)',
+            r'wikipedia\s+([^.?!]+)',
+            r'information\s+on\s+([^.?!]+)',
+            r'summary\s+of\s+([^.?!]+)'
+        )]
+        self._news_patterns = [re.compile(p) for p in (
+            r'news\s+on\s+([^.?!]+)',
+            r'news\s+about\s+([^.?!]+)',
+            r'headlines\s+([^.?!]+)'
+        )]
+
     def _detect_intent_and_entities(self, prompt: str) -> List[Dict[str, Any]]:
         """
         Simple intent detection and entity extraction
         In a real model, this would be learned from training data
         """
         prompt_lower = prompt.lower()
+
+        # One tokenized pass over the prompt OR-ing intent bits into a
+        # plain int accumulator — no per-request set allocations
+        mask = 0
+        kw_to_bit = self._kw_to_bit
+        for token in prompt_lower.split():
+            mask |= kw_to_bit.get(token, 0)
+        for kw, bit in self._multi_kw_bits:
+            if not mask & bit and kw in prompt_lower:
+                mask |= bit
+
         intents = []
-        
-        # Weather detection
-        weather_keywords = ["weather", "temperature", "rain", "sunny", "cloudy", "forecast"]
-        cities = self._extract_cities(prompt)
-        if any(keyword in prompt_lower for keyword in weather_keywords) and cities:
-            for city in cities:
+
+        if mask & _WEATHER:
+            for city in self._extract_cities(prompt, prompt_lower):
                 intents.append({"type": "weather", "city": city})
-        
-        # Crypto detection
-        crypto_keywords = ["price", "crypto", "bitcoin", "ethereum", "btc", "eth", "coin"]
-        crypto_symbols = self._extract_crypto_symbols(prompt)
-        if any(keyword in prompt_lower for keyword in crypto_keywords):
+            if intents and self.return_on_first:
+                return intents
+
+        if mask & _CRYPTO:
+            crypto_symbols = self._extract_crypto_symbols(prompt_lower)
             if crypto_symbols:
                 for symbol in crypto_symbols:
                     intents.append({"type": "crypto", "symbol": symbol})
             else:
                 # Default to BTC if crypto mentioned but no specific symbol
                 intents.append({"type": "crypto", "symbol": "bitcoin"})
-        
-        # Wikipedia detection
-        wiki_keywords = ["wikipedia", "wiki", "summary", "information about", "tell me about"]
-        if any(keyword in prompt_lower for keyword in wiki_keywords):
-            topic = self._extract_wiki_topic(prompt)
+            if intents and self.return_on_first:
+                return intents
+
+        if mask & _WIKI:
+            topic = self._extract_wiki_topic(prompt, prompt_lower)
             if topic:
                 intents.append({"type": "wikipedia", "topic": topic})
-        
-        # Search detection
-        search_keywords = ["search", "find", "who won", "latest", "recent"]
-        if any(keyword in prompt_lower for keyword in search_keywords):
-            query = self._extract_search_query(prompt)
+            if intents and self.return_on_first:
+                return intents
+
+        if mask & _SEARCH:
+            query = self._extract_search_query(prompt, prompt_lower)
             if query:
                 intents.append({"type": "search", "query": query})
-        
-        # Joke detection
-        joke_keywords = ["joke", "funny", "humor", "laugh", "amusing"]
-        if any(keyword in prompt_lower for keyword in joke_keywords):
+            if intents and self.return_on_first:
+                return intents
+
+        if mask & _JOKE:
             intents.append({"type": "joke"})
-        
-        # News detection
-        news_keywords = ["news", "headlines", "latest news", "current events"]
-        if any(keyword in prompt_lower for keyword in news_keywords):
-            topic = self._extract_news_topic(prompt)
+            if intents and self.return_on_first:
+                return intents
+
+        if mask & _NEWS:
+            topic = self._extract_news_topic(prompt_lower)
             if topic:
                 intents.append({"type": "news", "topic": topic})
-        
+
         return intents
     
-    def _extract_cities(self, prompt: str) -> List[str]:
+    def _extract_cities(self, prompt: str, prompt_lower: str) -> List[str]:
         """Extract city names from the prompt"""
-        # Simple pattern matching - in production, use NER models
+        # Simple pattern matching - in production, use NER models.
+        # One pass over the tokens: known cities and likely capitalized
+        # names are collected together, in prompt order.
         cities = []
-        common_cities = ["paris", "london", "new york", "tokyo", "berlin", "madrid", "rome", "moscow", "beijing", "sydney"]
-        
-        prompt_lower = prompt.lower()
-        for city in common_cities:
+        for word in prompt.split():
+            lower = word.lower()
+            if lower in self._city_set:
+                cities.append(lower.title())
+            elif word.istitle() and len(word) > 2 and lower not in _STOPWORDS:
+                cities.append(word)
+
+        for city in self._multi_word_cities:
             if city in prompt_lower:
                 cities.append(city.title())
-        
-        # Also check for capitalized words that might be cities
-        words = prompt.split()
-        for word in words:
-            if word.istitle() and len(word) > 2 and word.lower() not in ["the", "and", "for", "what", "how"]:
-                cities.append(word)
-        
-        return list(set(cities))  # Remove duplicates
+
+        # dict.fromkeys dedupes without losing order
+        return list(dict.fromkeys(cities))
     
-    def _extract_crypto_symbols(self, prompt: str) -> List[str]:
-        """Extract cryptocurrency symbols from the prompt"""
-        crypto_map = {
-            "bitcoin": "bitcoin",
-            "btc": "bitcoin",
-            "ethereum": "ethereum",
-            "eth": "ethereum",
-            "dogecoin": "dogecoin",
-            "doge": "dogecoin",
-            "cardano": "cardano",
-            "ada": "cardano",
-            "polkadot": "polkadot",
-            "dot": "polkadot"
-        }
-        
-        symbols = []
-        prompt_lower = prompt.lower()
-        
-        for key, value in crypto_map.items():
-            if key in prompt_lower:
-                symbols.append(value)
-        
-        return list(set(symbols))
+    def _extract_crypto_symbols(self, prompt_lower: str) -> List[str]:
+        """Extract cryptocurrency symbols from the lowered prompt"""
+        return list(dict.fromkeys(
+            _CRYPTO_MAP[token]
+            for token in prompt_lower.split()
+            if token in _CRYPTO_MAP
+        ))
     
-    def _extract_wiki_topic(self, prompt: str) -> str:
+    def _extract_wiki_topic(self, prompt: str, prompt_lower: str) -> str:
         """Extract Wikipedia topic from prompt"""
         # Simple extraction - look for words after "about" or similar
-        patterns = [
-            r'about\s+([^.?!]+)',
-            r'wikipedia\s+([^.?!]+)',
-            r'information\s+on\s+([^.?!]+)',
-            r'summary\s+of\s+([^.?!]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, prompt.lower())
+        for pattern in self._wiki_patterns:
+            match = pattern.search(prompt_lower)
             if match:
                 return match.group(1).strip()
         
@@ -170,29 +279,20 @@ class TinyGPT:
         
         return "general knowledge"
     
-    def _extract_search_query(self, prompt: str) -> str:
+    def _extract_search_query(self, prompt: str, prompt_lower: str) -> str:
         """Extract search query from prompt"""
         # Remove common question words and return the main query
-        query = prompt.lower()
-        
-        # Remove question words
         question_words = ["who", "what", "where", "when", "why", "how", "search", "find"]
-        words = query.split()
+        words = prompt_lower.split()
         filtered_words = [w for w in words if w not in question_words]
         
         return " ".join(filtered_words).strip() or prompt
     
-    def _extract_news_topic(self, prompt: str) -> str:
-        """Extract news topic from prompt"""
+    def _extract_news_topic(self, prompt_lower: str) -> str:
+        """Extract news topic from the lowered prompt"""
         # Look for words after "news" or similar
-        patterns = [
-            r'news\s+on\s+([^.?!]+)',
-            r'news\s+about\s+([^.?!]+)',
-            r'headlines\s+([^.?!]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, prompt.lower())
+        for pattern in self._news_patterns:
+            match = pattern.search(prompt_lower)
             if match:
                 return match.group(1).strip()
         
@@ -214,36 +314,15 @@ class TinyGPT:
         
         for intent in intents:
             intent_type = intent["type"]
-            
-            if intent_type in self.response_patterns:
-                pattern = random.choice(self.response_patterns[intent_type])
-                
-                # Fill in the pattern with extracted entities
-                if intent_type == "weather" and "city" in intent:
-                    response = pattern.format(city=f'"{intent["city"]}"')
-                elif intent_type == "crypto" and "symbol" in intent:
-                    response = pattern.format(symbol=f'"{intent["symbol"]}"')
-                elif intent_type == "wikipedia" and "topic" in intent:
-                    response = pattern.format(topic=f'"{intent["topic"]}"')
-                elif intent_type == "search" and "query" in intent:
-                    response = pattern.format(query=f'"{intent["query"]}"')
-                elif intent_type == "news" and "topic" in intent:
-                    response = pattern.format(topic=f'"{intent["topic"]}"')
-                else:
-                    response = pattern.replace("({", "()").replace("})", ")")
-                
-                response_parts.append(response)
+
+            fillers = self._intent_fillers.get(intent_type)
+            if fillers is not None:
+                idx = self._pattern_cursors[intent_type]
+                self._pattern_cursors[intent_type] = (idx + 1) % len(fillers)
+                response_parts.append(fillers[idx](intent))
         
         return " ".join(response_parts)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Return model information"""
-        return {
-            "name": self.model_name,
-            "temperature": self.temperature,
-            "capabilities": [
-                "text_generation",
-                "tool_calling",
-                "context_understanding"
-            ]
-        }
\ No newline at end of file
+        return self._model_info
\ No newline at end of file
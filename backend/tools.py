@@ -2,47 +2,161 @@
 Tool implementations for TinyGPT-MCP
 Implements various tools that can be called by the model
 """
+import asyncio
 import httpx
-import json
-from typing import Dict, Any, Optional
+import orjson
+import time
+from typing import Dict, Any, List, Optional
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+from cachetools import TTLCache
+
+# Formatted timestamp cached per second; datetime.now().isoformat() per
+# call adds up under load and second resolution is all callers need
+_ts_cache = [0, ""]
+
+def _now_iso() -> str:
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[:] = [t, datetime.fromtimestamp(t, tz=timezone.utc).isoformat()]
+    return _ts_cache[1]
 
 class ToolRegistry:
     """Registry of available tools for the MCP system"""
-    
+
     def __init__(self):
+        # One pooled client shared by every tool; opening a fresh
+        # AsyncClient per call paid a TCP+TLS handshake each time and
+        # threw the connection away immediately
+        self.client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=10.0
+        )
         self.tools = {
-            "weather": WeatherTool(),
-            "crypto_price": CryptoPriceTool(),
-            "wiki": WikipediaTool(),
-            "search": SearchTool(),
-            "joke": JokeTool(),
-            "news": NewsTool()
+            "weather": WeatherTool(self.client),
+            "crypto_price": CryptoPriceTool(self.client),
+            "wiki": WikipediaTool(self.client),
+            "search": SearchTool(self.client),
+            "joke": JokeTool(self.client),
+            "news": NewsTool(self.client)
         }
-    
+        # Tool calls repeat heavily within a session; cache results per
+        # tool with TTLs matched to how fast each source changes. Jokes
+        # are deliberately uncached so repeats stay fresh.
+        self._caches = {
+            "weather": TTLCache(maxsize=256, ttl=300),
+            "crypto_price": TTLCache(maxsize=256, ttl=30),
+            "wiki": TTLCache(maxsize=512, ttl=86400),
+            "search": TTLCache(maxsize=256, ttl=1800),
+            "news": TTLCache(maxsize=256, ttl=300)
+        }
+        # Per-key locks so concurrent identical calls fetch only once
+        self._key_locks: Dict[Any, asyncio.Lock] = {}
+        # The tool set is fixed after construction, so the description
+        # payload can be built once instead of per request
+        self._descriptions = tuple(
+            {
+                "name": name,
+                "description": tool.get_description(),
+                "parameters": tool.get_parameters()
+            }
+            for name, tool in self.tools.items()
+        )
+
+    async def aclose(self):
+        """Close the shared HTTP client (call on application shutdown)"""
+        await self.client.aclose()
+
     async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Execute a tool with given arguments"""
         if tool_name not in self.tools:
             raise ValueError(f"Unknown tool: {tool_name}")
-        
+
         tool = self.tools[tool_name]
-        return await tool.execute(arguments)
+
+        cache = self._caches.get(tool_name)
+        if cache is None:
+            return await tool.execute(arguments)
+
+        key = (tool_name, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        lock = self._key_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Re-check under the lock: a concurrent duplicate may have
+                # populated the cache while we waited
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+
+                result = await tool.execute(arguments)
+                cache[key] = result
+                return result
+        finally:
+            self._key_locks.pop(key, None)
     
+    async def batch_execute(
+        self,
+        calls: List[Dict[str, Any]],
+        max_concurrent: int = 8,
+        stop_on_error: bool = False,
+        timeout_ms: int = 8000
+    ) -> List[Any]:
+        """
+        Execute a batch of tool calls under one concurrency budget
+
+        Each entry carries "function" and "arguments". Results come back
+        in call order; failures are returned as the raised exception
+        object, unless stop_on_error is set, in which case the first
+        failure cancels the remaining calls and is re-raised.
+        """
+        sem = asyncio.Semaphore(max_concurrent)
+        timeout = timeout_ms / 1000
+
+        async def run_one(call):
+            async with sem:
+                return await asyncio.wait_for(
+                    self.execute_tool(call["function"], call["arguments"]),
+                    timeout
+                )
+
+        tasks = [asyncio.ensure_future(run_one(call)) for call in calls]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=not stop_on_error)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+
     def get_tool_descriptions(self) -> List[Dict[str, Any]]:
         """Get descriptions of all available tools"""
-        descriptions = []
-        for name, tool in self.tools.items():
-            descriptions.append({
-                "name": name,
-                "description": tool.get_description(),
-                "parameters": tool.get_parameters()
-            })
-        return descriptions
+        return list(self._descriptions)
+
+_registry_singleton: Optional[ToolRegistry] = None
+
+def get_registry() -> ToolRegistry:
+    """Return the process-wide ToolRegistry
+
+    Engines constructed per request share one registry (and therefore
+    one HTTP connection pool and result cache) instead of rebuilding the
+    whole tool graph each time.
+    """
+    global _registry_singleton
+    if _registry_singleton is None:
+        _registry_singleton = ToolRegistry()
+    return _registry_singleton
 
 class BaseTool:
     """Base class for all tools"""
-    
+
+    def __init__(self, client: httpx.AsyncClient):
+        # Injected by the registry so all tools share one connection pool
+        self.client = client
+
     async def execute(self, arguments: Dict[str, Any]) -> Any:
         """Execute the tool with given arguments"""
         raise NotImplementedError
@@ -58,7 +172,8 @@ class BaseTool:
 class WeatherTool(BaseTool):
     """Weather information tool using OpenWeatherMap API"""
     
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        super().__init__(client)
         # For demo purposes, we'll use a free weather API or mock data
         self.api_key = os.getenv("OPENWEATHER_API_KEY", "demo_key")
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
@@ -70,24 +185,23 @@ class WeatherTool(BaseTool):
         # In production, uncomment the API call below
         
         """
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": "metric"
+        params = {
+            "q": city,
+            "appid": self.api_key,
+            "units": "metric"
+        }
+        response = await self.client.get(self.base_url, params=params)
+
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            return {
+                "city": data["name"],
+                "temperature": data["main"]["temp"],
+                "description": data["weather"][0]["description"],
+                "humidity": data["main"]["humidity"]
             }
-            response = await client.get(self.base_url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "city": data["name"],
-                    "temperature": data["main"]["temp"],
-                    "description": data["weather"][0]["description"],
-                    "humidity": data["main"]["humidity"]
-                }
-            else:
-                return {"error": "Failed to fetch weather data"}
+        else:
+            return {"error": "Failed to fetch weather data"}
         """
         
         # Mock weather data for demo
@@ -113,38 +227,38 @@ class WeatherTool(BaseTool):
 class CryptoPriceTool(BaseTool):
     """Cryptocurrency price tool using CoinGecko API"""
     
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        super().__init__(client)
         self.base_url = "https://api.coingecko.com/api/v3/simple/price"
-    
+
     async def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         symbol = arguments.get("query", arguments.get("symbol", "bitcoin"))
-        
+
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    "ids": symbol,
-                    "vs_currencies": "usd"
-                }
-                response = await client.get(self.base_url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if symbol in data:
-                        return {
-                            "symbol": symbol,
-                            "price": f"${data[symbol]['usd']:,}",
-                            "currency": "USD",
-                            "timestamp": datetime.now().isoformat()
-                        }
-                
-                # Fallback mock data
-                return {
-                    "symbol": symbol,
-                    "price": "$45,123.45" if symbol == "bitcoin" else "$2,456.78",
-                    "currency": "USD",
-                    "status": "demo_data"
-                }
-        
+            params = {
+                "ids": symbol,
+                "vs_currencies": "usd"
+            }
+            response = await self.client.get(self.base_url, params=params)
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if symbol in data:
+                    return {
+                        "symbol": symbol,
+                        "price": f"${data[symbol]['usd']:,}",
+                        "currency": "USD",
+                        "timestamp": _now_iso()
+                    }
+
+            # Fallback mock data
+            return {
+                "symbol": symbol,
+                "price": "$45,123.45" if symbol == "bitcoin" else "$2,456.78",
+                "currency": "USD",
+                "status": "demo_data"
+            }
+
         except Exception as e:
             return {"error": f"Failed to fetch crypto price: {str(e)}"}
     
@@ -162,23 +276,23 @@ class CryptoPriceTool(BaseTool):
 class WikipediaTool(BaseTool):
     """Wikipedia summary tool"""
     
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        super().__init__(client)
         self.base_url = "https://en.wikipedia.org/api/rest_v1/page/summary"
-    
+
     async def execute(self, arguments: Dict[str, Any]) -> str:
         topic = arguments.get("query", arguments.get("topic", "Python programming"))
-        
+
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.base_url}/{topic.replace(' ', '_')}"
-                response = await client.get(url)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("extract", f"No summary found for {topic}")
-                
-                # Fallback mock data
-                return f"Wikipedia summary for '{topic}': This is a demonstration summary. In production, this would contain the actual Wikipedia extract for the requested topic."
+            url = f"{self.base_url}/{topic.replace(' ', '_')}"
+            response = await self.client.get(url)
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                return data.get("extract", f"No summary found for {topic}")
+
+            # Fallback mock data
+            return f"Wikipedia summary for '{topic}': This is a demonstration summary. In production, this would contain the actual Wikipedia extract for the requested topic."
         
         except Exception as e:
             return f"Error fetching Wikipedia summary: {str(e)}"
@@ -197,34 +311,34 @@ class WikipediaTool(BaseTool):
 class SearchTool(BaseTool):
     """Web search tool using DuckDuckGo API"""
     
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        super().__init__(client)
         self.base_url = "https://api.duckduckgo.com/"
-    
+
     async def execute(self, arguments: Dict[str, Any]) -> str:
         query = arguments.get("query", "general search")
-        
+
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    "q": query,
-                    "format": "json",
-                    "no_html": "1"
-                }
-                response = await client.get(self.base_url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Try to get instant answer first
-                    if data.get("AbstractText"):
-                        return data["AbstractText"]
-                    
-                    # Otherwise, get first result
-                    if data.get("Results") and len(data["Results"]) > 0:
-                        return data["Results"][0].get("Text", "No detailed results found")
-                
-                # Fallback mock data
-                return f"Search results for '{query}': This is a demonstration search result. In production, this would contain actual search results from DuckDuckGo API."
+            params = {
+                "q": query,
+                "format": "json",
+                "no_html": "1"
+            }
+            response = await self.client.get(self.base_url, params=params)
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+
+                # Try to get instant answer first
+                if data.get("AbstractText"):
+                    return data["AbstractText"]
+
+                # Otherwise, get first result
+                if data.get("Results") and len(data["Results"]) > 0:
+                    return data["Results"][0].get("Text", "No detailed results found")
+
+            # Fallback mock data
+            return f"Search results for '{query}': This is a demonstration search result. In production, this would contain actual search results from DuckDuckGo API."
         
         except Exception as e:
             return f"Search error: {str(e)}"
@@ -243,27 +357,27 @@ class SearchTool(BaseTool):
 class JokeTool(BaseTool):
     """Joke tool using JokeAPI"""
     
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        super().__init__(client)
         self.base_url = "https://v2.jokeapi.dev/joke/Any"
-    
+
     async def execute(self, arguments: Dict[str, Any]) -> str:
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    "blacklistFlags": "nsfw,religious,political,racist,sexist,explicit"
-                }
-                response = await client.get(self.base_url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if data["type"] == "single":
-                        return data["joke"]
-                    else:
-                        return f"{data['setup']} {data['delivery']}"
-                
-                # Fallback joke
-                return "Why do programmers prefer dark mode? Because light attracts bugs! 🐛"
+            params = {
+                "blacklistFlags": "nsfw,religious,political,racist,sexist,explicit"
+            }
+            response = await self.client.get(self.base_url, params=params)
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+
+                if data["type"] == "single":
+                    return data["joke"]
+                else:
+                    return f"{data['setup']} {data['delivery']}"
+
+            # Fallback joke
+            return "Why do programmers prefer dark mode? Because light attracts bugs! 🐛"
         
         except Exception as e:
             return "Why don't scientists trust atoms? Because they make up everything! ⚛️"
@@ -277,7 +391,8 @@ class JokeTool(BaseTool):
 class NewsTool(BaseTool):
     """News tool - simplified version"""
     
-    def __init__(self):
+    def __init__(self, client: httpx.AsyncClient):
+        super().__init__(client)
         self.api_key = os.getenv("NEWS_API_KEY", "demo_key")
         self.base_url = "https://newsapi.org/v2/everything"
     
@@ -289,25 +404,24 @@ class NewsTool(BaseTool):
         
         """
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    "q": topic,
-                    "apiKey": self.api_key,
-                    "language": "en",
-                    "sortBy": "publishedAt"
-                }
-                response = await client.get(self.base_url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    articles = data.get("articles", [])
-                    
-                    if articles:
-                        article = articles[0]
-                        return f"{article['title']} - {article['description']}"
-                
-                return f"No recent news found for {topic}"
-        
+            params = {
+                "q": topic,
+                "apiKey": self.api_key,
+                "language": "en",
+                "sortBy": "publishedAt"
+            }
+            response = await self.client.get(self.base_url, params=params)
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                articles = data.get("articles", [])
+
+                if articles:
+                    article = articles[0]
+                    return f"{article['title']} - {article['description']}"
+
+            return f"No recent news found for {topic}"
+
         except Exception as e:
             return f"News error: {str(e)}"
         """
@@ -2,84 +2,110 @@
 Cryptocurrency Tool - CoinGecko API integration
 """
 import httpx
+from types import MappingProxyType
 from typing import Dict, Any
 from core.tool_manager import BaseTool
+from core.cache import async_ttl_cache
 
 class CryptoTool(BaseTool):
     """Cryptocurrency price tool using CoinGecko API"""
-    
+
+    _PARAM_ALIASES = {"coin": "symbol"}
+    _DESCRIPTION = "Get current cryptocurrency prices and 24h changes"
+    # Read-only schema shared by every introspection call
+    _PARAMETERS = MappingProxyType({
+        "symbol": {
+            "type": "string",
+            "description": "Cryptocurrency symbol or list of symbols (e.g., bitcoin, ethereum, btc, eth)",
+            "required": True
+        }
+    })
+
+    # Static demo quotes shared by the fallback path
+    _DEMO_PRICES = {
+        "bitcoin": {"price": "$45,123.45", "change": "+2.34%"},
+        "ethereum": {"price": "$2,456.78", "change": "-1.23%"},
+        "dogecoin": {"price": "$0.08", "change": "+5.67%"}
+    }
+    _DEMO_DEFAULT = {"price": "$1,234.56", "change": "+0.00%"}
+
+    # Common ticker -> CoinGecko id aliases, built once at import
+    _SYMBOL_MAP = {
+        "btc": "bitcoin",
+        "eth": "ethereum",
+        "doge": "dogecoin",
+        "ada": "cardano",
+        "dot": "polkadot"
+    }
+
     def __init__(self):
         super().__init__()
         self.category = "finance"
         self.base_url = "https://api.coingecko.com/api/v3/simple/price"
-    
-    async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        symbol = params.get("symbol", params.get("coin", "bitcoin")).lower()
-        
-        # Map common symbols
-        symbol_map = {
-            "btc": "bitcoin",
-            "eth": "ethereum",
-            "doge": "dogecoin",
-            "ada": "cardano",
-            "dot": "polkadot"
+        # Fixed query parts built once; execute only adds the ids
+        self._base_params = {
+            "vs_currencies": "usd,eur",
+            "include_24hr_change": "true"
         }
-        
-        symbol = symbol_map.get(symbol, symbol)
-        
+    
+    # Prices move fast; one minute keeps them fresh
+    @async_ttl_cache(60)
+    async def execute(self, params: Dict[str, Any]) -> Any:
+        requested = params.get("symbol", "bitcoin")
+
+        # CoinGecko's /simple/price takes comma-separated ids, so a
+        # multi-coin query costs one round-trip instead of one per coin.
+        # A plain string keeps the original single-dict result shape.
+        single = isinstance(requested, str)
+        symbols = [requested] if single else list(requested)
+
+        symbols = [self._SYMBOL_MAP.get(s.lower(), s.lower()) for s in symbols]
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.base_url,
-                    params={
-                        "ids": symbol,
-                        "vs_currencies": "usd,eur",
-                        "include_24hr_change": "true"
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if symbol in data:
-                        coin_data = data[symbol]
-                        return {
-                            "symbol": symbol.upper(),
-                            "name": symbol.title(),
-                            "price_usd": f"${coin_data['usd']:,.2f}",
-                            "price_eur": f"€{coin_data['eur']:,.2f}",
-                            "change_24h": f"{coin_data.get('usd_24h_change', 0):.2f}%",
-                            "timestamp": "real-time"
-                        }
-        
-        except Exception as e:
+            # Shared keep-alive client; see BaseTool._http
+            response = await self._get_with_retry(
+                self.base_url,
+                params={**self._base_params, "ids": ",".join(symbols)}
+            )
+
+            if response.status_code == 200:
+                data = self._parse_json(response)
+                quotes = []
+                for symbol in symbols:
+                    if symbol not in data:
+                        continue
+                    coin_data = data[symbol]
+                    quotes.append({
+                        "symbol": symbol.upper(),
+                        "name": symbol.title(),
+                        "price_usd": f"${coin_data['usd']:,.2f}",
+                        "price_eur": f"€{coin_data['eur']:,.2f}",
+                        "change_24h": f"{coin_data.get('usd_24h_change', 0):.2f}%",
+                        "timestamp": "real-time"
+                    })
+                if quotes:
+                    return quotes[0] if single else quotes
+
+        except (httpx.HTTPError, ValueError, KeyError):
+            # Transport failure or unexpected payload; fall through to demo data
             pass
-        
+
         # Demo data
-        demo_prices = {
-            "bitcoin": {"price": "$45,123.45", "change": "+2.34%"},
-            "ethereum": {"price": "$2,456.78", "change": "-1.23%"},
-            "dogecoin": {"price": "$0.08", "change": "+5.67%"}
-        }
-        
-        demo_data = demo_prices.get(symbol, {"price": "$1,234.56", "change": "+0.00%"})
-        
-        return {
-            "symbol": symbol.upper(),
-            "name": symbol.title(),
-            "price_usd": demo_data["price"],
-            "change_24h": demo_data["change"],
-            "status": "demo_data"
-        }
+        quotes = []
+        for symbol in symbols:
+            demo_data = self._DEMO_PRICES.get(symbol, self._DEMO_DEFAULT)
+            quotes.append({
+                "symbol": symbol.upper(),
+                "name": symbol.title(),
+                "price_usd": demo_data["price"],
+                "change_24h": demo_data["change"],
+                "status": "demo_data"
+            })
+
+        return quotes[0] if single else quotes
     
     def get_description(self) -> str:
-        return "Get current cryptocurrency prices and 24h changes"
+        return self._DESCRIPTION
     
     def get_parameters(self) -> Dict[str, Any]:
-        return {
-            "symbol": {
-                "type": "string",
-                "description": "Cryptocurrency symbol (e.g., bitcoin, ethereum, btc, eth)",
-                "required": True
-            }
-        }
\ No newline at end of file
+        return self._PARAMETERS
@@ -3,62 +3,77 @@ Joke Tool - JokeAPI integration
 """
 import httpx
 import random
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Any
 from core.tool_manager import BaseTool
 
+# Category URLs are drawn from a handful of values, so the formatted
+# string is cached rather than rebuilt per call
+@lru_cache(maxsize=16)
+def _url_for(category: str) -> str:
+    return f"https://v2.jokeapi.dev/joke/{category}"
+
 class JokeTool(BaseTool):
     """Joke tool using JokeAPI"""
-    
+
+    _DESCRIPTION = "Get a random clean joke for entertainment"
+    # Read-only schema shared by every introspection call
+    _PARAMETERS = MappingProxyType({
+        "category": {
+            "type": "string",
+            "description": "Joke category (Programming, Miscellaneous, Dark, Pun, Spooky, Christmas)",
+            "required": False,
+            "default": "Any"
+        }
+    })
+
+    # Flags excluded from every request, fixed at import
+    _BLACKLIST = "nsfw,religious,political,racist,sexist,explicit"
+
+    # Fallback jokes; a class-level tuple is shared by all instances
+    fallback_jokes = (
+        "Why do programmers prefer dark mode? Because light attracts bugs! 🐛",
+        "Why don't scientists trust atoms? Because they make up everything! ⚛️",
+        "How do you organize a space party? You planet! 🚀",
+        "Why did the scarecrow win an award? He was outstanding in his field! 🌾",
+        "What do you call a fake noodle? An impasta! 🍝"
+    )
+
     def __init__(self):
         super().__init__()
         self.category = "entertainment"
         self.base_url = "https://v2.jokeapi.dev/joke/Any"
-        
-        # Fallback jokes
-        self.fallback_jokes = [
-            "Why do programmers prefer dark mode? Because light attracts bugs! 🐛",
-            "Why don't scientists trust atoms? Because they make up everything! ⚛️",
-            "How do you organize a space party? You planet! 🚀",
-            "Why did the scarecrow win an award? He was outstanding in his field! 🌾",
-            "What do you call a fake noodle? An impasta! 🍝"
-        ]
+        # Private RNG; the module-level functions share one locked
+        # Mersenne Twister that contends under concurrent load
+        self._rng = random.Random()
     
     async def execute(self, params: Dict[str, Any]) -> str:
         category = params.get("category", "Any")
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://v2.jokeapi.dev/joke/{category}",
-                    params={
-                        "blacklistFlags": "nsfw,religious,political,racist,sexist,explicit"
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if data["type"] == "single":
-                        return data["joke"]
-                    else:
-                        return f"{data['setup']} {data['delivery']}"
+            response = await self._get_with_retry(
+                _url_for(category),
+                params={"blacklistFlags": self._BLACKLIST}
+            )
+
+            if response.status_code == 200:
+                data = self._parse_json(response)
+
+                if data["type"] == "single":
+                    return data["joke"]
+                else:
+                    return f"{data['setup']} {data['delivery']}"
         
-        except Exception as e:
+        except (httpx.HTTPError, ValueError, KeyError):
+            # Transport failure or unexpected payload; fall through to demo data
             pass
         
         # Return random fallback joke
-        return random.choice(self.fallback_jokes)
+        return self._rng.choice(self.fallback_jokes)
     
     def get_description(self) -> str:
-        return "Get a random clean joke for entertainment"
+        return self._DESCRIPTION
     
     def get_parameters(self) -> Dict[str, Any]:
-        return {
-            "category": {
-                "type": "string",
-                "description": "Joke category (Programming, Miscellaneous, Dark, Pun, Spooky, Christmas)",
-                "required": False,
-                "default": "Any"
-            }
-        }
\ No newline at end of file
+        return self._PARAMETERS
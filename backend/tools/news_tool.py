@@ -2,69 +2,103 @@
 News Tool - NewsAPI integration
 """
 import httpx
+from types import MappingProxyType
 from typing import Dict, Any, List
 from core.tool_manager import BaseTool
+from core.cache import async_ttl_cache
 
 class NewsTool(BaseTool):
     """News tool using NewsAPI"""
+
+    _PARAM_ALIASES = {"query": "topic"}
+    _DESCRIPTION = "Get latest news articles on any topic"
+    # Read-only schema shared by every introspection call
+    _PARAMETERS = MappingProxyType({
+        "topic": {
+            "type": "string",
+            "description": "News topic or keyword to search for",
+            "required": True
+        }
+    })
     
     def __init__(self):
         super().__init__()
         self.category = "information"
         self.api_key = "demo_key"  # Replace with actual NewsAPI key
         self.base_url = "https://newsapi.org/v2/everything"
+        # Fixed query parts built once; execute only adds the topic
+        self._base_params = {
+            "apiKey": self.api_key,
+            "language": "en",
+            "sortBy": "publishedAt",
+            "pageSize": 3
+        }
     
+    # Headlines refresh on the order of minutes
+    @async_ttl_cache(600)
     async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        topic = params.get("topic", params.get("query", "technology"))
-        
+        topic = params.get("topic", "technology")
+
+        # Without a real key NewsAPI rejects the call after a full
+        # round-trip and we end up on demo data anyway — skip the trip
+        if self.api_key in ("demo_key", "", None):
+            return self._demo_response(topic)
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.base_url,
-                    params={
-                        "q": topic,
-                        "apiKey": self.api_key,
-                        "language": "en",
-                        "sortBy": "publishedAt",
-                        "pageSize": 3
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    articles = data.get("articles", [])
-                    
-                    if articles:
-                        formatted_articles = []
-                        for article in articles[:3]:
-                            formatted_articles.append({
-                                "title": article["title"],
-                                "description": article["description"],
-                                "source": article["source"]["name"],
-                                "url": article["url"],
-                                "published": article["publishedAt"]
-                            })
-                        
-                        return {
-                            "topic": topic,
-                            "articles": formatted_articles,
-                            "total_results": data.get("totalResults", 0)
+            response = await self._get_with_retry(
+                self.base_url,
+                params={**self._base_params, "q": topic}
+            )
+
+            if response.status_code == 200:
+                data = self._parse_json(response)
+                articles = data.get("articles", [])
+
+                if articles:
+                    formatted_articles = [
+                        {
+                            "title": article["title"],
+                            "description": article["description"],
+                            "source": article["source"]["name"],
+                            "url": article["url"],
+                            "published": article["publishedAt"]
                         }
+                        for article in articles[:3]
+                    ]
+
+                    return {
+                        "topic": topic,
+                        "articles": formatted_articles,
+                        "total_results": data.get("totalResults", 0)
+                    }
         
-        except Exception as e:
+        except (httpx.HTTPError, ValueError, KeyError):
+            # Transport failure or unexpected payload; fall through to demo data
             pass
-        
-        # Demo data
+
+        return self._demo_response(topic)
+
+    # Static demo scaffold; only the topic varies per call
+    _DEMO_TITLE = "Latest developments in {}"
+    _DEMO_DESCRIPTION = (
+        "This is a demonstration news article about {}. In production, "
+        "this would show real headlines and summaries from NewsAPI.org."
+    )
+    _DEMO_ARTICLE = {
+        "source": "Demo News",
+        "url": "https://example.com/news",
+        "published": "2024-01-15T10:00:00Z"
+    }
+
+    def _demo_response(self, topic: str) -> Dict[str, Any]:
+        """Demo data for testing and keyless deployments"""
         return {
             "topic": topic,
             "articles": [
                 {
-                    "title": f"Latest developments in {topic}",
-                    "description": f"This is a demonstration news article about {topic}. In production, this would show real headlines and summaries from NewsAPI.org.",
-                    "source": "Demo News",
-                    "url": "https://example.com/news",
-                    "published": "2024-01-15T10:00:00Z"
+                    "title": self._DEMO_TITLE.format(topic),
+                    "description": self._DEMO_DESCRIPTION.format(topic),
+                    **self._DEMO_ARTICLE
                 }
             ],
             "total_results": 1,
@@ -72,13 +106,7 @@ class NewsTool(BaseTool):
         }
     
     def get_description(self) -> str:
-        return "Get latest news articles on any topic"
+        return self._DESCRIPTION
     
     def get_parameters(self) -> Dict[str, Any]:
-        return {
-            "topic": {
-                "type": "string",
-                "description": "News topic or keyword to search for",
-                "required": True
-            }
-        }
\ No newline at end of file
+        return self._PARAMETERS
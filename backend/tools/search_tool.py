@@ -2,78 +2,96 @@
 Search Tool - Web search using DuckDuckGo API
 """
 import httpx
+from types import MappingProxyType
 from typing import Dict, Any
 from core.tool_manager import BaseTool
+from core.cache import async_ttl_cache
 
 class SearchTool(BaseTool):
     """Web search tool using DuckDuckGo API"""
+
+    _PARAM_ALIASES = {"q": "query"}
+    _DESCRIPTION = "Search the web for information using DuckDuckGo"
+    # Read-only schema shared by every introspection call
+    _PARAMETERS = MappingProxyType({
+        "query": {
+            "type": "string",
+            "description": "Search query or question",
+            "required": True
+        }
+    })
     
+    # Static demo scaffold; only the query varies per call
+    _DEMO_RESULT = (
+        "Search results for '{}': This is a demonstration search result. "
+        "In production, this would contain actual search results from "
+        "DuckDuckGo API with relevant information, links, and sources."
+    )
+    _DEMO_TEMPLATE = {
+        "source": "DuckDuckGo (demo)",
+        "type": "demo_result",
+        "status": "demo_data"
+    }
+
     def __init__(self):
         super().__init__()
         self.category = "information"
         self.base_url = "https://api.duckduckgo.com/"
     
+    # Instant answers are stable enough for half an hour
+    @async_ttl_cache(1800)
     async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        query = params.get("query", params.get("q", "latest news"))
+        query = params.get("query", "latest news")
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.base_url,
-                    params={
-                        "q": query,
-                        "format": "json",
-                        "no_html": "1",
-                        "skip_disambig": "1"
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Try instant answer first
-                    if data.get("AbstractText"):
+            response = await self._get_with_retry(
+                self.base_url,
+                params={
+                    "q": query,
+                    "format": "json",
+                    "no_html": "1",
+                    "skip_disambig": "1"
+                }
+            )
+
+            if response.status_code == 200:
+                data = self._parse_json(response)
+
+                # Try instant answer first
+                if data.get("AbstractText"):
+                    return {
+                        "query": query,
+                        "result": data["AbstractText"],
+                        "source": data.get("AbstractSource", "DuckDuckGo"),
+                        "url": data.get("AbstractURL", ""),
+                        "type": "instant_answer"
+                    }
+
+                # Try related topics
+                if data.get("RelatedTopics"):
+                    first_topic = data["RelatedTopics"][0]
+                    if isinstance(first_topic, dict) and "Text" in first_topic:
                         return {
                             "query": query,
-                            "result": data["AbstractText"],
-                            "source": data.get("AbstractSource", "DuckDuckGo"),
-                            "url": data.get("AbstractURL", ""),
-                            "type": "instant_answer"
+                            "result": first_topic["Text"],
+                            "source": "DuckDuckGo",
+                            "url": first_topic.get("FirstURL", ""),
+                            "type": "related_topic"
                         }
-                    
-                    # Try related topics
-                    if data.get("RelatedTopics"):
-                        first_topic = data["RelatedTopics"][0]
-                        if isinstance(first_topic, dict) and "Text" in first_topic:
-                            return {
-                                "query": query,
-                                "result": first_topic["Text"],
-                                "source": "DuckDuckGo",
-                                "url": first_topic.get("FirstURL", ""),
-                                "type": "related_topic"
-                            }
         
-        except Exception as e:
+        except (httpx.HTTPError, ValueError, KeyError):
+            # Transport failure or unexpected payload; fall through to demo data
             pass
         
         # Demo data
         return {
             "query": query,
-            "result": f"Search results for '{query}': This is a demonstration search result. In production, this would contain actual search results from DuckDuckGo API with relevant information, links, and sources.",
-            "source": "DuckDuckGo (demo)",
-            "type": "demo_result",
-            "status": "demo_data"
+            "result": self._DEMO_RESULT.format(query),
+            **self._DEMO_TEMPLATE
         }
     
     def get_description(self) -> str:
-        return "Search the web for information using DuckDuckGo"
+        return self._DESCRIPTION
     
     def get_parameters(self) -> Dict[str, Any]:
-        return {
-            "query": {
-                "type": "string",
-                "description": "Search query or question",
-                "required": True
-            }
-        }
\ No newline at end of file
+        return self._PARAMETERS
@@ -2,70 +2,88 @@
 Weather Tool - OpenWeatherMap API integration
 """
 import httpx
+from types import MappingProxyType
 from typing import Dict, Any
 from core.tool_manager import BaseTool
+from core.cache import async_ttl_cache
 
 class WeatherTool(BaseTool):
     """Weather information tool using OpenWeatherMap API"""
+
+    _PARAM_ALIASES = {"city": "location"}
+    _DESCRIPTION = "Get current weather information for any city worldwide"
+    # Read-only schema shared by every introspection call
+    _PARAMETERS = MappingProxyType({
+        "location": {
+            "type": "string",
+            "description": "City name or location to get weather for",
+            "required": True
+        }
+    })
     
     def __init__(self):
         super().__init__()
         self.category = "information"
         self.api_key = "demo_key"  # Replace with actual API key
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        # Fixed query parts built once; execute only adds the location
+        self._base_params = {"appid": self.api_key, "units": "metric"}
     
+    # Weather barely changes inside five minutes
+    @async_ttl_cache(300)
     async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        location = params.get("location", params.get("city", "London"))
-        
+        location = params.get("location", "London")
+
+        # Without a real key OpenWeatherMap rejects the call after a full
+        # round-trip and we end up on demo data anyway — skip the trip
+        if self.api_key in ("demo_key", "", None):
+            return self._demo_response(location)
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.base_url,
-                    params={
-                        "q": location,
-                        "appid": self.api_key,
-                        "units": "metric"
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        "location": data["name"],
-                        "temperature": f"{data['main']['temp']}°C",
-                        "description": data["weather"][0]["description"].title(),
-                        "humidity": f"{data['main']['humidity']}%",
-                        "pressure": f"{data['main']['pressure']} hPa",
-                        "wind_speed": f"{data.get('wind', {}).get('speed', 0)} m/s"
-                    }
+            response = await self._get_with_retry(
+                self.base_url,
+                params={**self._base_params, "q": location}
+            )
+
+            if response.status_code == 200:
+                data = self._parse_json(response)
+                # Bind the nested sections once instead of re-indexing
+                # the payload for every field
+                main = data["main"]
+                return {
+                    "location": data["name"],
+                    "temperature": f"{main['temp']}°C",
+                    "description": data["weather"][0]["description"].title(),
+                    "humidity": f"{main['humidity']}%",
+                    "pressure": f"{main['pressure']} hPa",
+                    "wind_speed": f"{data.get('wind', {}).get('speed', 0)} m/s"
+                }
         
-        except Exception as e:
-            # Fallback to demo data
+        except (httpx.HTTPError, ValueError, KeyError):
+            # Transport failure or unexpected payload; fall through to demo data
             pass
-        
-        # Demo data for testing
-        return {
-            "location": location,
-            "temperature": "22°C",
-            "description": "Partly Cloudy",
-            "humidity": "65%",
-            "pressure": "1013 hPa",
-            "wind_speed": "3.2 m/s",
-            "status": "demo_data"
-        }
+
+        return self._demo_response(location)
+
+    # Static demo scaffold; only the location varies per call
+    _DEMO_TEMPLATE = {
+        "temperature": "22°C",
+        "description": "Partly Cloudy",
+        "humidity": "65%",
+        "pressure": "1013 hPa",
+        "wind_speed": "3.2 m/s",
+        "status": "demo_data"
+    }
+
+    def _demo_response(self, location: str) -> Dict[str, Any]:
+        """Demo data for testing and keyless deployments"""
+        return {"location": location, **self._DEMO_TEMPLATE}
     
     def get_description(self) -> str:
-        return "Get current weather information for any city worldwide"
+        return self._DESCRIPTION
     
     def get_parameters(self) -> Dict[str, Any]:
-        return {
-            "location": {
-                "type": "string",
-                "description": "City name or location to get weather for",
-                "required": True
-            }
-        }
+        return self._PARAMETERS
     
     def validate_params(self, params: Dict[str, Any]) -> bool:
         return "location" in params or "city" in params
\ No newline at end of file
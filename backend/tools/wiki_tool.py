@@ -2,61 +2,84 @@
 Wikipedia Tool - Wikipedia API integration
 """
 import httpx
+from types import MappingProxyType
+from urllib.parse import quote
 from typing import Dict, Any
 from core.tool_manager import BaseTool
+from core.cache import async_ttl_cache
 
 class WikiTool(BaseTool):
     """Wikipedia summary tool"""
+
+    _PARAM_ALIASES = {"query": "topic"}
+    _DESCRIPTION = "Get Wikipedia summary and information about any topic"
+    # Read-only schema shared by every introspection call
+    _PARAMETERS = MappingProxyType({
+        "topic": {
+            "type": "string",
+            "description": "Topic to search on Wikipedia",
+            "required": True
+        }
+    })
     
+    # Static demo scaffold; only the topic varies per call
+    _DEMO_SUMMARY = (
+        "This is a demonstration summary for '{}'. In production, this "
+        "would contain the actual Wikipedia extract with comprehensive "
+        "information about the topic, including key facts, history, and "
+        "relevant details."
+    )
+    _DEMO_URL = "https://en.wikipedia.org/wiki/{}"
+
     def __init__(self):
         super().__init__()
         self.category = "information"
         self.base_url = "https://en.wikipedia.org/api/rest_v1/page/summary"
+        # URL template built once; execute only fills in the title
+        self._url_template = self.base_url + "/{}"
     
+    # Summaries are effectively static day to day
+    @async_ttl_cache(86400)
     async def execute(self, params: Dict[str, Any]) -> str:
-        topic = params.get("topic", params.get("query", "Artificial Intelligence"))
+        topic = params.get("topic", "Artificial Intelligence")
         
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.base_url}/{topic.replace(' ', '_')}"
-                response = await client.get(url, timeout=10.0)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    extract = data.get("extract", "")
-                    
-                    if extract:
-                        # Limit to reasonable length
-                        if len(extract) > 500:
-                            extract = extract[:500] + "..."
-                        
-                        return {
-                            "title": data.get("title", topic),
-                            "summary": extract,
-                            "url": data.get("content_urls", {}).get("desktop", {}).get("page", ""),
-                            "source": "Wikipedia"
-                        }
+            # Percent-encode so titles like "C++" or non-ASCII names form
+            # a valid URL instead of 404ing into the demo fallback
+            url = self._url_template.format(quote(topic.replace(' ', '_'), safe=''))
+            response = await self._get_with_retry(url)
+
+            if response.status_code == 200:
+                data = self._parse_json(response)
+                extract = data.get("extract", "")
+
+                if extract:
+                    # Limit to reasonable length
+                    if len(extract) > 500:
+                        extract = extract[:500] + "..."
+
+                    return {
+                        "title": data.get("title", topic),
+                        "summary": extract,
+                        "url": data.get("content_urls", {}).get("desktop", {}).get("page", ""),
+                        "source": "Wikipedia"
+                    }
         
-        except Exception as e:
+        except (httpx.HTTPError, ValueError, KeyError):
+            # Transport failure or unexpected payload; fall through to demo data
             pass
         
         # Demo data
         return {
             "title": topic,
-            "summary": f"This is a demonstration summary for '{topic}'. In production, this would contain the actual Wikipedia extract with comprehensive information about the topic, including key facts, history, and relevant details.",
-            "url": f"https://en.wikipedia.org/wiki/{topic.replace(' ', '_')}",
+            "summary": self._DEMO_SUMMARY.format(topic),
+            "url": self._DEMO_URL.format(topic.replace(' ', '_')),
             "source": "Wikipedia (demo)",
             "status": "demo_data"
         }
     
     def get_description(self) -> str:
-        return "Get Wikipedia summary and information about any topic"
+        return self._DESCRIPTION
     
     def get_parameters(self) -> Dict[str, Any]:
-        return {
-            "topic": {
-                "type": "string",
-                "description": "Topic to search on Wikipedia",
-                "required": True
-            }
-        }
\ No newline at end of file
+        return self._PARAMETERS
@@ -2,31 +2,44 @@
 Logging configuration for TinyGPT-MCP
 """
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 
+# Listeners are kept referenced so their worker threads aren't collected
+_listeners = []
+
 def setup_logger(name: str) -> logging.Logger:
     """
     Setup logger with consistent formatting
+
+    Records pass through a QueueHandler so request handlers never block on
+    the stream write; a QueueListener thread does the actual I/O.
     """
     logger = logging.getLogger(name)
-    
+
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(logging.INFO)
-    
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
-    
+
     # Formatter
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, console_handler)
+    listener.start()
+    _listeners.append(listener)
+
+    return logger